@@ -3,10 +3,10 @@
 
 import json
 import queue
-import sqlite3
 import networkx
 import graphviz
 import multiprocessing
+import numpy as np
 from pathlib import Path
 import matplotlib.pyplot as plt
 from concurrent.futures import ProcessPoolExecutor
@@ -16,11 +16,54 @@ from .documents import PlainCachedDocument
 from .documents import fromExtension as DocumentFromExtension
 from .document_finder import classes as docClasses
 from .document_finder import find_references as referenceFinder
-from .word_count import WordCounter
+from .parsed_cache import ParsedDocumentCache
+from .crawl_record import CrawlRecord
+from .crawl_record import ContextFreeResolver
+from .crawl_record import crawl_path
+from .similarity import SimilarityEngine
+from .near_duplicates import canonical_map
+from .near_duplicates import collapse_duplicates
+from .near_duplicates import find_near_duplicates
+from .graph_core import GraphCore
+from .snapshot import load_graph
+from .snapshot import snapshot_from_json
+from .snapshot import snapshot_path
+from .metrics import degree_arrays
+from .metrics import embed_degree_metrics
+from .metrics import summary_statistics
+from .cycles import cycles_through
+from .connectivity import embed_connectivity
+from .reachability import build_reachability_index
+from .reachability import index_path
+from .layout import build_layout
+from .layout import layout_path
+from .lod import lod_path
+from .lod import render_lod
+from .sqlite_export import write_sqlite
+from .sqlite_export import is_upsertable
+from .neo4j_export import neo4j_path
+from .neo4j_export import write_neo4j
+from .streaming import output_path
+from .streaming import write_json
+from .streaming import write_lines
+from .stages import Stage
+from .stages import StageScheduler
+from .quadrants import QuadrantEngine
+from .quadrants import QUADRANT_SINKS
+from .quadrants import quadrant_counts
+from .pagerank import pagerank
+from .pagerank import ranks_dict
+from .pagerank import warm_start
+from .pagerank import root_personalization
+from .distance_store import MATRICES
+from .distance_store import labels_path
+from .distance_store import matrix_path
+from .distance_store import export_distances_json
+from .distance_blocks import compute_distance_blocks
+from .shortest_paths import ShortestPaths
 
 INFINITY = float('inf')
 EMPTY_ITER = iter(list())
-QUADRANT_COLOR = ['#7DB643', '#43B5B5', '#7C43B5', '#B54343']
 
 
 def find_rootdoc(rootdoc='rootdoc.txt'):
@@ -40,15 +83,19 @@ def find_rootdoc(rootdoc='rootdoc.txt'):
     }
 
 
-def generate_graph(rootdoc='rootdoc.txt', grapfn='graph.json', keep_temporal_context=True):
+def generate_graph(rootdoc='rootdoc.txt', grapfn='graph.json', keep_temporal_context=True, projected_from=None, near_duplicates=None):
     rootsrc, rootname = Path(rootdoc).read_text().splitlines()
+    resolver = None if keep_temporal_context else ContextFreeResolver()
+    replay = None if resolver is None else projected_from
+    crawl = CrawlRecord()
     analyzedDocPaths = set()
     pendingDocCchMgr = queue.Queue()
-    pendingDocCchMgr.put(docClasses[rootsrc](rootname))
+    root = docClasses[rootsrc](rootname)
+    pendingDocCchMgr.put(root if resolver is None else resolver.without_temporal_context(root))
     graph = dict()
     while not pendingDocCchMgr.empty():
         docCchMgr = pendingDocCchMgr.get_nowait()
-        docPath = docCchMgr.cached()
+        docPath = docCchMgr.cached() if resolver is None else resolver.cached(docCchMgr)
         currName = f"{docCchMgr.__class__.__name__}: {docCchMgr._identifier}"
         if docPath is not None:
             currName = str(docPath)[6:]
@@ -71,24 +118,40 @@ def generate_graph(rootdoc='rootdoc.txt', grapfn='graph.json', keep_temporal_con
         print(f"Document @ {currName}")
         if docFFcls is None:
             continue
-        docFF = PlainCachedDocument(str(docPath)[6:], docFFcls, docPath)
-        doc = docFF.parsed_from_cache()
-        newReferences = referenceFinder(str(docPath)[6:], doc, docCchMgr.context(docPath))
-        if not keep_temporal_context:
-            newReferences = list(map(lambda a: a.whithout_temporal_context(), newReferences))
+        recorded = None if replay is None else replay.references(docPath)
+        if recorded is not None:
+            newReferences = list(map(resolver.reference, recorded))
+        else:
+            doc = PlainCachedDocument(str(docPath)[6:], docFFcls, docPath).parsed_from_cache()
+            newReferences = referenceFinder(str(docPath)[6:], doc, docCchMgr.context(docPath))
+            if not keep_temporal_context:
+                newReferences = list(map(resolver.without_temporal_context, newReferences))
+        crawl.record(docPath, newReferences)
         for newReference in newReferences:
-            newDocPath = newReference.cached()
+            newDocPath = newReference.cached() if resolver is None else resolver.cached(newReference)
             newName = f"{newReference.__class__.__name__}: {newReference._identifier}"
             if newDocPath is not None:
                 newName = str(newDocPath)[6:]
             graph[currName]['mention_freq'][newName] = graph[currName]['mention_freq'].get(newName, 0) + 1
         for item in sorted(
             newReferences,
-            key=lambda dcm: (not dcm.is_cached(), dcm.slowness(), dcm._identifier)
+            key=lambda dcm: (not (dcm.is_cached() if resolver is None else resolver.is_cached(dcm)), dcm.slowness(), dcm._identifier)
         ):
             pendingDocCchMgr.put_nowait(item)
         print(f"Queue size: {pendingDocCchMgr.qsize()} // Processed: {len(analyzedDocPaths)}")
-    Path(grapfn).write_text(json.dumps(graph))
+    if resolver is not None:
+        print(f"Context-free references: {json.dumps(resolver.stats())}")
+    crawl.save(crawl_path(grapfn))
+    if near_duplicates is not None:
+        rootName = next(iter(graph))
+        canonical = canonical_map(
+            find_near_duplicates(threshold=near_duplicates),
+            lambda key: (key != rootName, len(key), key)
+        )
+        collapsed = collapse_duplicates(graph, canonical)
+        print(f"Near-duplicate documents collapsed: {len(graph)-len(collapsed)}")
+        graph = collapsed
+    write_json(grapfn, graph)
 
 
 def dijkstra(graph, initial, hops_mode=False):
@@ -142,75 +205,35 @@ def dijkstra_min_path(dijkstra_tuple, initial, target):
     return ([], None)
 
 
-def embed_metrics(graph):
-    metrics = dict()
-    metrics['basic'] = dict()
-    metrics['basic']['node_count'] = len(graph)
-    metrics['basic']['vertex_count'] = 0
-    metrics['basic']['vertex_weight_sum'] = 0
-    for node in graph.values():
-        metrics['basic']['vertex_count'] += len(node['mention_freq'])
-        metrics['basic']['vertex_weight_sum'] += sum(node['mention_freq'].values())
-    metrics['matrix_labels'] = list(graph.keys())
-    metrics['degree'] = dict()
-    for key, node in graph.items():
-        metric = dict()
-        metric['degree_out'] = len(node['mention_freq'].values())
-        metric['weight_out'] = sum(node['mention_freq'].values())
-        metric['degree_in'] = 0
-        metric['weight_in'] = 0
-        for node2 in graph.values():
-            count = node2['mention_freq'].get(key, 0)
-            if count > 0:
-                metric['degree_in'] += 1
-                metric['weight_in'] += count
-        metrics['degree'][key] = metric
-    return metrics
-
-
-def embed_metrics_distance(graph, metrics):
+def embed_metrics(graph, core=None):
+    if core is None:
+        core = GraphCore.from_graph(graph)
+    return embed_degree_metrics(core)
+
+
+def embed_metrics_distance(graph, metrics, core=None):
     distance = dict()
-    matrix_labels = metrics['matrix_labels']
+    if core is None:
+        core = GraphCore.from_graph(graph, metrics['matrix_labels'])
+    sources = range(len(core))
+    chunksize = max(1, len(core)//(4*multiprocessing.cpu_count()))
     tpe = ProcessPoolExecutor(multiprocessing.cpu_count())
-    print("Slow Dijkstra: Hops")
-    dj = Dijkstra(graph, True)
-    dijkstra = list(tpe.map(dj, matrix_labels))
-    distance['distance_matrix_hops'] = [[
-        dijkstra[pos][0].get(target, -1)
-        for target in matrix_labels
-    ] for pos, initial in enumerate(matrix_labels)]
-    del dijkstra
-    del dj
-    print("Slow Dijkstra: Weight")
-    dj = Dijkstra(graph, False)
-    dijkstra = list(tpe.map(dj, matrix_labels))
-    distance['distance_matrix_weight'] = [[
-        dijkstra[pos][0].get(target, -1)
-        for target in matrix_labels
-    ] for pos, initial in enumerate(matrix_labels)]
-    del dijkstra
-    del dj
+    for kind, hops_mode in [('hops', True), ('weight', False)]:
+        print(f"Shortest paths: {kind} ({'BFS' if hops_mode else 'Dijkstra'})")
+        distance[f'distance_matrix_{kind}'] = list(
+            tpe.map(ShortestPaths(core.adjacency, hops_mode), sources, chunksize=chunksize))
     tpe.shutdown()
     return distance
 
 
-def embed_metrics_connectivity(graph, metrics, g, namefield):
-    connectivity = dict()
-    print('connectivity_edge')
-    connectivity['connectivity_edge'] = networkx.edge_connectivity(g)
-    print('connectivity_node')
-    connectivity['connectivity_node'] = networkx.node_connectivity(g)
-    return connectivity
+def embed_metrics_connectivity(view, workers=None):
+    return embed_connectivity(view, workers)
 
 
-def get_transition_map(graph):
-    transitions = [(source, target) for source, nd in graph.items() for target in nd['mention_freq'].keys()]
-    transmap = dict()
-    for s, t in transitions:
-        if t not in transmap:
-            transmap[t] = list()
-        transmap[t].append(s)
-    return transmap
+def get_transition_map(graph, core=None):
+    if core is None:
+        core = GraphCore.from_graph(graph)
+    return core.transition_map
 
 
 def find_all_paths(tm, initial, target, accumulator=None):
@@ -226,28 +249,25 @@ def find_all_paths(tm, initial, target, accumulator=None):
         yield from EMPTY_ITER
 
 
-def find_all_loopy_paths(graph, node):
-    tm = get_transition_map(graph)
+def find_all_loopy_paths(graph, node, core=None):
+    tm = get_transition_map(graph, core)
     accumulator = [node]
     for intermediate in tm[node]:
         yield from find_all_paths(tm, intermediate, node, accumulator)
     yield from EMPTY_ITER
 
 
-def get_reverse_transition_map(graph, sequential):
-    transitions = [
-        (sequential.index(source), sequential.index(target))
-        for source, nd in graph.items() for target in nd['mention_freq'].keys()
-    ]
-    revtransmap = [list() for _ in sequential]
-    for s, t in transitions:
-        revtransmap[t].append(s)
-    return tuple([tuple(i) for i in revtransmap])
+def get_reverse_transition_map(graph, sequential, core=None):
+    if core is None:
+        core = GraphCore.from_graph(graph, sequential)
+    return core.reverse
 
 
-def find_all_loopy_paths_reversedly(graph, node, sequential):
-    revtransmap = get_reverse_transition_map(graph, sequential)
-    accumulator = [sequential.index(node)]
+def find_all_loopy_paths_reversedly(graph, node, sequential, core=None):
+    if core is None:
+        core = GraphCore.from_graph(graph, sequential)
+    revtransmap = core.reverse
+    accumulator = [core.index[node]]
     for intermediate in revtransmap[accumulator[0]]:
         yield from find_all_paths_reversedly(revtransmap, intermediate, accumulator[0], accumulator)
     yield from EMPTY_ITER
@@ -266,14 +286,13 @@ def find_all_paths_reversedly(revtransmap, initial, target, accumulator=None):
         yield from EMPTY_ITER
 
 
-def find_related_to_root(graph, root, sequential=None):
+def find_related_to_root(graph, root, sequential=None, max_length=None, max_count=None, core=None):
     print(root)
     lst = list()
-    if sequential is None:
-        sequential = list(graph.keys())
-    sequential = tuple(sequential)
-    for item in find_all_loopy_paths_reversedly(graph, root['name'], sequential):
-        item = [sequential[i] for i in item]
+    if core is None:
+        core = GraphCore.from_graph(graph, sequential)
+    for item in cycles_through(core, core.index[root['name']], max_length, max_count):
+        item = [core.labels[i] for i in item]
         print(item)
         lst.append(item)
     print()
@@ -293,26 +312,19 @@ def get_quadrant(x, y, lx, ly):
         return 2
 
 
-def draw_degree_quadrants(graph, degrees, key):
+def draw_degree_quadrants(engine, key):
     quadrants = dict()
-    points = [
-        (degree[f'{key}_in'], degree[f'{key}_out'])
-        for degree in degrees.values()
-    ]
-    xs, ys = list(zip(*points))
-    maxx = max(xs)
-    minx = min(xs)
-    maxy = max(ys)
-    miny = min(ys)
-    avgx = sum(xs)/len(xs)
-    avgy = sum(ys)/len(ys)
-    midx = (maxx-minx)/2
-    midy = (maxy-miny)/2
-    quads = [0, 0, 0, 0]
-    for point in points:
-        quads[get_quadrant(*point, midx, midy)-1] += 1
+    xs, ys = engine.points(key)
+    maxx = int(xs.max())
+    minx = int(xs.min())
+    maxy = int(ys.max())
+    miny = int(ys.min())
+    avgx = int(xs.sum())/len(xs)
+    avgy = int(ys.sum())/len(ys)
+    midx, midy = engine.halfrange(key)
+    quads = quadrant_counts(np.asarray(engine.codes(key, (midx, midy)), dtype=np.int8))
     plt.figure(figsize=(12, 9), dpi=300)
-    plt.scatter(*list(zip(*points)), color='blue', alpha=.1)
+    plt.scatter(xs, ys, color='blue', alpha=.1, rasterized=True)
     plt.plot([minx, maxx], [avgy, avgy], color='red', alpha=.5)
     plt.plot([avgx, avgx], [miny, maxy], color='red', alpha=.5)
     plt.plot([minx, maxx], [midy, midy], color='green', alpha=.5)
@@ -331,311 +343,412 @@ def draw_degree_quadrants(graph, degrees, key):
     return quadrants
 
 
-def convert_outputs(prefix, temporal_context):
-    Path("flavors.json").write_text(
-        json.dumps(
-            [
-                *json.loads(Path("flavors.json").read_text()),
-                prefix
-            ],
-            indent=4
-        )
+class Flavor:
+    def __init__(self, prefix, temporal_context):
+        self.prefix = prefix
+        self.label_key = 'name' if temporal_context else 'generic_name'
+        self.core = GraphCore.load(prefix)
+        self.labels = self.core.column(self.label_key)
+        self._graph = None
+        self._view = None
+        self._quadrants = None
+        self._layout = None
+
+    @property
+    def graph(self):
+        if self._graph is None:
+            self._graph = load_graph(self.prefix)
+        return self._graph
+
+    @property
+    def view(self):
+        if self._view is None:
+            self._view = self.core.projected(self.labels)
+        return self._view
+
+    @property
+    def layout(self):
+        if self._layout is None:
+            self._layout = build_layout(self.view, self.prefix)
+        return self._layout
+
+    @property
+    def quadrants(self):
+        if self._quadrants is None:
+            self._quadrants = QuadrantEngine(self.core, degree_arrays(self.core))
+        return self._quadrants
+
+
+_flavors = dict()
+
+
+def flavor_of(prefix, temporal_context):
+    key = (prefix, temporal_context, Path(f'{prefix}.json').stat().st_mtime_ns)
+    if key not in _flavors:
+        _flavors.clear()
+        _flavors[key] = Flavor(prefix, temporal_context)
+    return _flavors[key]
+
+
+def export_graph(prefix, temporal_context, options):
+    projected_from = options.get('projected_from')
+    generate_graph(
+        grapfn=f'{prefix}.json',
+        keep_temporal_context=temporal_context,
+        projected_from=None if projected_from is None else CrawlRecord.load(crawl_path(f'{projected_from}.json')),
+        near_duplicates=options.get('near_duplicates'),
     )
-    label_key = 'name' if temporal_context else 'generic_name'
-    if not Path(f'{prefix}.json').exists():
-        generate_graph(grapfn=f'{prefix}.json', keep_temporal_context=temporal_context)
-    graph = json.loads(Path(f'{prefix}.json').read_text())
-    if not Path(f'{prefix}_metrics.json').exists():
-        Path(f'{prefix}_metrics.json').write_text(json.dumps(embed_metrics(graph), indent=2))
-    metrics = json.loads(Path(f'{prefix}_metrics.json').read_text())
-    if not Path(f'{prefix}_metrics_distances.json').exists():
-        Path(f'{prefix}_metrics_distances.json').write_text(json.dumps(embed_metrics_distance(graph, metrics)))
-    # to_networkx
-    g = networkx.DiGraph()
-    g.add_nodes_from([node[label_key] for node in graph.values()])
-    g.add_edges_from([
-        (node_source[label_key], graph[target][label_key])
-        for node_source in graph.values()
-        for target in node_source['mention_freq'].keys()
-    ])
-    networkx.write_graphml(g, f'{prefix}_unweighted.graphml')
-    for src in graph.values():
-        srcnm = src[label_key]
-        for tgt, w in src['mention_freq'].items():
-            tgtnm = graph[tgt][label_key]
-            g[srcnm][tgtnm]['weight'] = w
-    networkx.write_graphml(g, f'{prefix}_weighted.graphml')
-    g = networkx.DiGraph(networkx.read_graphml(f'{prefix}_unweighted.graphml'))
-    g = networkx.DiGraph(networkx.read_graphml(f'{prefix}_weighted.graphml'))
-    # to_sqlite
-    if Path(f'{prefix}.db').exists():
-        Path(f'{prefix}.db').unlink()
-    sqldb = sqlite3.connect(f'{prefix}.db')
-    cur = sqldb.cursor()
-    cur.execute('''CREATE TABLE node (
-        name VARCHAR(255),
-        generic_name VARCHAR(255),
-        type VARCHAR(255),
-        doc_id VARCHAR(255),
-        monitored bool,
-        pub_date VARCHAR(255),
-        in_force bool)''')
-    cur.execute('''CREATE TABLE edge (
-        node_src INTEGER,
-        node_dst INTEGER,
-        mentions INTEGER,
-        FOREIGN KEY(node_src) REFERENCES node(rowid) ON UPDATE CASCADE ON DELETE CASCADE,
-        FOREIGN KEY(node_dst) REFERENCES node(rowid) ON UPDATE CASCADE ON DELETE CASCADE)''')
-    cur.execute(f'''CREATE VIEW nodes AS
-        SELECT
-            rowid as id,
-            {label_key} as label
-        FROM node''')
-    cur.execute('''CREATE VIEW edges AS
-        SELECT
-            rowid as id,
-            node_src as source,
-            node_dst as target,
-            mentions as weight
-        FROM edge''')
-    node_name_to_id = dict()
-    for node in graph.values():
-        cur.execute(
-            '''INSERT INTO node(
-                name,
-                generic_name,
-                type,
-                doc_id,
-                monitored,
-                pub_date,
-                in_force
-            ) VALUES(?,?,?,?,?,?,?)''',
-            (
-                node['name'],
-                node['generic_name'],
-                node['type'],
-                node['doc_id'],
-                node['monitored'],
-                node['pub_date'],
-                node['in_force']
-            )
-        )
-        node_name_to_id[node['name']] = cur.lastrowid
-    for node in graph.values():
-        node_src_nm = node['name']
-        node_src = node_name_to_id[node_src_nm]
-        for node_dst_nm, frequency in node['mention_freq'].items():
-            node_dst = node_name_to_id[node_dst_nm]
-            cur.execute(
-                '''INSERT INTO edge(node_src,node_dst,mentions) VALUES(?,?,?)''',
-                (node_src, node_dst, frequency)
-            )
-    cur.close()
-    sqldb.commit()
-    Path(f'{prefix}.sql').write_text('\n'.join(sqldb.iterdump()))
+
+
+def export_snapshot(prefix, temporal_context, options):
+    snapshot_from_json(prefix)
+
+
+def export_metrics(prefix, temporal_context, options):
+    flavor = flavor_of(prefix, temporal_context)
+    write_json(f'{prefix}_metrics.json', embed_metrics(flavor.graph, flavor.core), indent=2)
+
+
+def export_metrics_summary(prefix, temporal_context, options):
+    flavor = flavor_of(prefix, temporal_context)
+    Path(f'{prefix}_metrics_summary.json').write_text(json.dumps(summary_statistics(flavor.core), indent=2))
+
+
+def export_reachability(prefix, temporal_context, options):
+    build_reachability_index(flavor_of(prefix, temporal_context).core, prefix)
+
+
+def export_distances(prefix, temporal_context, options):
+    compute_distance_blocks(flavor_of(prefix, temporal_context).core, prefix, workers=options.get('workers'))
+
+
+def export_distances_json_stage(prefix, temporal_context, options):
+    export_distances_json(prefix, compress=options.get('compress_exports', False))
+
+
+def export_layout(prefix, temporal_context, options):
+    flavor_of(prefix, temporal_context).layout
+
+
+def export_graphml(prefix, temporal_context, options):
+    flavor = flavor_of(prefix, temporal_context)
+    pos = {label: flavor.layout.graphml_pos(label) for label in flavor.view.labels}
+    for weighted, desc in ((False, 'unweighted'), (True, 'weighted')):
+        g = flavor.view.to_networkx(weighted=weighted)
+        networkx.set_node_attributes(g, pos, 'pos')
+        networkx.write_graphml(g, f'{prefix}_{desc}.graphml')
+
+
+def export_sqlite(prefix, temporal_context, options):
+    flavor = flavor_of(prefix, temporal_context)
+    # upsert into a database this exporter wrote before; rebuild anything else
+    incremental = is_upsertable(f'{prefix}.db')
+    sqldb, _ = write_sqlite(f'{prefix}.db', flavor.core, flavor.label_key, incremental)
+    write_lines(f'{prefix}.sql', sqldb.iterdump(), compress=options.get('compress_exports', False))
     sqldb.close()
-    # to_csv
+
+
+def export_neo4j(prefix, temporal_context, options):
+    write_neo4j(neo4j_path(prefix), flavor_of(prefix, temporal_context).core)
+
+
+def export_csv(prefix, temporal_context, options):
+    flavor = flavor_of(prefix, temporal_context)
+    labels = flavor.labels
     with open(f'{prefix}.csv', 'w') as file:
         file.write('%s,%s,%s\n' % ("source", "target", "weight"))
-        for node in graph.values():
-            node_src_nm = node['name']
-            for node_dst_nm, frequency in node['mention_freq'].items():
-                file.write('%s,%s,%d\n' % (
-                    graph[node_src_nm][label_key],
-                    graph[node_dst_nm][label_key],
-                    frequency
-                ))
-    # to_graphviz
-    gv = graphviz.Digraph()
-    for node in graph.values():
+        for node_src, node_dst, frequency in flavor.core.edges():
+            file.write('%s,%s,%d\n' % (labels[node_src], labels[node_dst], frequency))
+
+
+def export_graphviz(prefix, temporal_context, options):
+    flavor = flavor_of(prefix, temporal_context)
+    core = flavor.core
+    gv = graphviz.Digraph(graph_attr={'layout': 'neato', 'splines': 'false', 'overlap': 'true'})
+    for node in range(len(core)):
         gv.node(
-            str(node_name_to_id[node['name']]),
+            str(node+1),
+            pos=flavor.layout.graphviz_pos(flavor.labels[node]),
             label='\n'.join(list(map(str, filter(
                 lambda a: a is not None,
-                [node['type'], node['doc_id'], node['pub_date']]
+                [core.column(column)[node] for column in ('type', 'doc_id', 'pub_date')]
             ))))
         )
+    for node_src, node_dst, frequency in core.edges():
+        gv.edge(str(node_src+1), str(node_dst+1), str(frequency))
+    gv.save(f'{prefix}.gv')  # pinned coordinates: neato renders without a layout pass
+
+
+def export_connectivity(prefix, temporal_context, options):
+    Path(f'{prefix}_metrics_connectivity.json').write_text(json.dumps(
+        embed_metrics_connectivity(flavor_of(prefix, temporal_context).view, options.get('workers')), indent=2))
+
+
+def export_render(prefix, temporal_context, options, desc):
+    flavor = flavor_of(prefix, temporal_context)
+    g = flavor.view.to_networkx(weighted=desc == 'weighted')
+    networkx.draw(
+        g,
+        pos=flavor.layout.as_dict(),
+        width=[1+np.log(max(weight, 1)) for _, _, weight in g.edges.data('weight', 1)],
+    )
+    plt.savefig(f'{prefix}_{desc}.pdf')
+    plt.savefig(f'{prefix}_{desc}.png')
+    plt.close()
+
+
+def export_render_unweighted(prefix, temporal_context, options):
+    export_render(prefix, temporal_context, options, 'unweighted')
+
+
+def export_render_weighted(prefix, temporal_context, options):
+    export_render(prefix, temporal_context, options, 'weighted')
+
+
+def export_lod(prefix, temporal_context, options):
+    flavor = flavor_of(prefix, temporal_context)
+    render_lod(flavor.view, flavor.layout, lod_path(prefix), options.get('lod_score', 'pagerank'))
+
+
+def export_root(prefix, temporal_context, options):
+    Path(f'{prefix}_root.json').write_text(json.dumps(
+        flavor_of(prefix, temporal_context).graph[find_rootdoc()['name']]
+    ))
+
+
+def export_quadrant_plot(prefix, temporal_context, options, weight):
+    desc = ('un'*int(not weight))+'weighted'
+    key = 'weight' if weight else 'degree'
+    dimen_cutoff = draw_degree_quadrants(flavor_of(prefix, temporal_context).quadrants, key)
+    plt.savefig(f'{prefix}_quads_{desc}.pdf', bbox_inches='tight')
+    plt.savefig(f'{prefix}_quads_{desc}.png', bbox_inches='tight')
+    plt.close()
+    Path(f'{prefix}_quads_{desc}.json').write_text(json.dumps(dimen_cutoff, indent=4))
+
+
+def export_quadrant_plot_weighted(prefix, temporal_context, options):
+    export_quadrant_plot(prefix, temporal_context, options, True)
+
+
+def export_quadrant_plot_unweighted(prefix, temporal_context, options):
+    export_quadrant_plot(prefix, temporal_context, options, False)
+
+
+def export_quadrant_csvs(prefix, temporal_context, options, weight):
+    flavor = flavor_of(prefix, temporal_context)
+    desc = ('un'*int(not weight))+'weighted'
+    key = 'weight' if weight else 'degree'
+    dimen_cutoff = json.loads(Path(f'{prefix}_quads_{desc}.json').read_text())
+    hr = (dimen_cutoff['halfrange']['x'], dimen_cutoff['halfrange']['y'])
+    flavor.quadrants.write_csvs(prefix, desc, flavor.labels, key, hr, weight)
+
+
+def export_quadrant_csvs_weighted(prefix, temporal_context, options):
+    export_quadrant_csvs(prefix, temporal_context, options, True)
+
+
+def export_quadrant_csvs_unweighted(prefix, temporal_context, options):
+    export_quadrant_csvs(prefix, temporal_context, options, False)
+
+
+def export_similarity_sheets(prefix, temporal_context, options):
+    flavor = flavor_of(prefix, temporal_context)
+    graph = flavor.graph
+    core = flavor.core
+    label_key = flavor.label_key
+    folder_out = Path(f'{prefix}_quads_unweighted_no2nd3rdquad')
+    folder_out.mkdir(parents=True, exist_ok=True)
+    key = 'degree'
+    dimen_cutoff = json.loads(Path(f'{prefix}_quads_unweighted.json').read_text())
+    hr = (dimen_cutoff['halfrange']['x'], dimen_cutoff['halfrange']['y'])
+    codes = flavor.quadrants.codes(key, hr)
+    colors = flavor.quadrants.colors(key, hr)
+    sheets = list()
+    similarityEngine = SimilarityEngine()
+    parsed = ParsedDocumentCache()
     for node in graph.values():
         node_src_nm = node['name']
-        node_src = node_name_to_id[node_src_nm]
-        for node_dst_nm, frequency in node['mention_freq'].items():
-            node_dst = node_name_to_id[node_dst_nm]
-            gv.edge(str(node_src), str(node_dst), str(frequency))
-    gv.save(f'{prefix}.gv')  # takes "forever" to render, "never" finishes
-    # connectivity
-    g = networkx.DiGraph(networkx.read_graphml(f'{prefix}_unweighted.graphml'))
-    if not Path(f'{prefix}_metrics_connectivity.json').exists():
-        Path(f'{prefix}_metrics_connectivity.json').write_text(json.dumps(
-            embed_metrics_connectivity(graph, metrics, g, label_key), indent=2))
-    # matplotlib rendering
-    if not Path(f'{prefix}_unweighted.pdf').exists() or not Path(f'{prefix}_unweighted.png').exists():
-        g = networkx.DiGraph(networkx.read_graphml(f'{prefix}_unweighted.graphml'))
-        networkx.draw(g)
-        plt.savefig(f'{prefix}_unweighted.pdf')
-        plt.savefig(f'{prefix}_unweighted.png')
-        plt.close()
-    if not Path(f'{prefix}_weighted.pdf').exists() or not Path(f'{prefix}_weighted.png').exists():
-        g = networkx.DiGraph(networkx.read_graphml(f'{prefix}_weighted.graphml'))
-        networkx.draw(g)
-        plt.savefig(f'{prefix}_weighted.pdf')
-        plt.savefig(f'{prefix}_weighted.png')
-        plt.close()
-    # Leave root document explicit
-    if not Path(f'{prefix}_root.json').exists():
-        Path(f'{prefix}_root.json').write_text(json.dumps(
-            graph[find_rootdoc()['name']]
+        if codes[core.index[node_src_nm]] in [2, 3]:
+            continue
+        sheets.append(node)
+        srcCacheKey = graph[node_src_nm]['filepath'][6:]
+        if len(srcCacheKey) <= 0:
+            continue
+        similarityEngine.add(srcCacheKey, parsed.word_counter(srcCacheKey))
+        for node_dst_nm in node['mention_freq'].keys():
+            dstCacheKey = graph[node_dst_nm]['filepath'][6:]
+            if len(dstCacheKey) > 0:
+                similarityEngine.add(dstCacheKey, parsed.word_counter(dstCacheKey))
+    similarityPairs = list({
+        (graph[node['name']]['filepath'][6:], graph[node_dst_nm]['filepath'][6:])
+        for node in sheets
+        for node_dst_nm in node['mention_freq'].keys()
+        if len(graph[node['name']]['filepath'][6:]) > 0 and len(graph[node_dst_nm]['filepath'][6:]) > 0
+    })
+    similarities = dict(zip(similarityPairs, similarityEngine.pairs(similarityPairs)))
+    for node in sheets:
+        node_src_nm = node['name']
+        srcCacheKey = graph[node_src_nm]['filepath'][6:]
+        with folder_out.joinpath(f'{node["generic_name"]}.csv').open('w') as file:
+            fmt = ','.join(['%s']*5)+'\n'
+            file.write(fmt % ("source", "target", "source_color", "target_color", "similarity"))
+            for node_dst_nm, frequency in node['mention_freq'].items():
+                # if codes[core.index[node_dst_nm]] == 3:
+                #     continue
+                dstCacheKey = graph[node_dst_nm]['filepath'][6:]
+                similarity = similarities.get((srcCacheKey, dstCacheKey))
+                similarity = '?' if similarity is None else str(similarity)
+                file.write(fmt % (
+                    graph[node_src_nm][label_key],
+                    graph[node_dst_nm][label_key],
+                    colors[core.index[node_src_nm]],
+                    colors[core.index[node_dst_nm]],
+                    similarity,
+                ))
+    print(f"Parsed document cache: {json.dumps(parsed.stats())}")
+
+
+def export_pagerank(prefix, temporal_context, options):
+    flavor = flavor_of(prefix, temporal_context)
+    view = flavor.view
+    labels = flavor.labels
+    warm = options.get('pagerank_warm_start', False)
+    for weighted, suffix in ((False, ''), (True, '_weighted')):
+        ranks, iterations = pagerank(
+            view,
+            weighted,
+            nstart=warm_start(f'{prefix}_pagerank{suffix}.json', view.labels) if warm else None
+        )
+        print(f"PageRank{suffix} converged in {iterations} iterations")
+        ranking = ranks_dict(view.labels, ranks)
+        Path(f'{prefix}_pagerank{suffix}.json').write_text(json.dumps(ranking, indent=2))
+        if not weighted:
+            pr = ranking
+    root = json.loads(Path(f'{prefix}_root.json').read_text())[flavor.label_key]
+    personalization = root_personalization(view.labels, root)
+    ranks, iterations = pagerank(
+        view,
+        personalization=personalization,
+        nstart=warm_start(f'{prefix}_pagerank_rootdoc.json', view.labels) if warm else None
+    )
+    print(f"PageRank_rootdoc converged in {iterations} iterations")
+    Path(f'{prefix}_pagerank_rootdoc.json').write_text(json.dumps(ranks_dict(view.labels, ranks), indent=2))
+    spr = sorted([
+        (k, v) for k, v in pr.items()
+    ], key=lambda a: (-a[1], a[0]))
+    Path(f'{prefix}_pagerank_ranked.json').write_text(json.dumps(spr, indent=2))
+    # dirLink = {k: set(v['mention_freq'].keys()) for k, v in graph.items()}
+    revLink = {label: set() for label in labels}
+    for src, dst, _ in flavor.core.edges():
+        revLink[labels[dst]].add(labels[src])
+    sptr = {spr[0][0]: spr[0][0]}
+    for node, rank in spr[1:]:
+        maxNode = sorted([x for x in revLink[node] if x != node], key=lambda a: -pr[a])[0]
+        sptr[node] = maxNode
+    Path(f'{prefix}_pagerank_ranked_spannedtree.json').write_text(json.dumps(sptr, indent=2))
+    table = ["source,target,source_weight,target_weight"]
+    for ns, nd in sptr.items():
+        ws = "%.32f" % pr[ns]
+        wd = "%.32f" % pr[nd]
+        table.append(f"{ns},{nd},{ws},{wd}")
+    Path(f'{prefix}_pagerank_ranked_spannedtree.csv').write_text('\n'.join(table)+'\n')
+
+
+def export_stages(prefix, temporal_context, options):
+    graphfn = f'{prefix}.json'
+    compress = options.get('compress_exports', False)
+    distances = [str(labels_path(prefix)), *(str(matrix_path(prefix, kind)) for kind in MATRICES)]
+    crawl = [] if options.get('projected_from') is None else [crawl_path(f"{options['projected_from']}.json")]
+    stages = [
+        Stage('graph', export_graph, ['rootdoc.txt', *crawl], [graphfn], params=(
+            temporal_context if options.get('near_duplicates') is None else [temporal_context, options['near_duplicates']]
+        ), adopt=True),
+        Stage('snapshot', export_snapshot, [graphfn], [snapshot_path(prefix)]),
+        Stage('metrics', export_metrics, [graphfn], [f'{prefix}_metrics.json'], adopt=True),
+        Stage('metrics_summary', export_metrics_summary, [graphfn], [f'{prefix}_metrics_summary.json'], adopt=True),
+        Stage('reachability', export_reachability, [graphfn], [index_path(prefix)]),
+        Stage('distances', export_distances, [graphfn], distances, adopt=True, exclusive=True),
+        Stage('layout', export_layout, [graphfn], [layout_path(prefix)]),
+        Stage('graphml', export_graphml, [graphfn, layout_path(prefix)], [f'{prefix}_unweighted.graphml', f'{prefix}_weighted.graphml']),
+        Stage('sqlite', export_sqlite, [graphfn], [f'{prefix}.db', output_path(f'{prefix}.sql', compress)]),
+        Stage('neo4j', export_neo4j, [graphfn], [neo4j_path(prefix)]),
+        Stage('csv', export_csv, [graphfn], [f'{prefix}.csv']),
+        Stage('graphviz', export_graphviz, [graphfn, layout_path(prefix)], [f'{prefix}.gv']),
+        Stage('connectivity', export_connectivity, [graphfn], [f'{prefix}_metrics_connectivity.json'], exclusive=True),
+        Stage('root', export_root, [graphfn, 'rootdoc.txt'], [f'{prefix}_root.json'], adopt=True),
+        Stage('pagerank', export_pagerank, [graphfn, f'{prefix}_root.json'], [
+            f'{prefix}_pagerank.json',
+            f'{prefix}_pagerank_weighted.json',
+            f'{prefix}_pagerank_rootdoc.json',
+            f'{prefix}_pagerank_ranked.json',
+            f'{prefix}_pagerank_ranked_spannedtree.json',
+            f'{prefix}_pagerank_ranked_spannedtree.csv',
+        ], params=options.get('pagerank_warm_start') or None),
+        Stage('similarity_sheets', export_similarity_sheets, [graphfn, f'{prefix}_quads_unweighted.json'], [
+            f'{prefix}_quads_unweighted_no2nd3rdquad',
+        ]),
+    ]
+    if options.get('render_mode', 'both') in ('full', 'both'):
+        for desc, render in (('unweighted', export_render_unweighted), ('weighted', export_render_weighted)):
+            stages.append(Stage(f'render_{desc}', render, [graphfn, layout_path(prefix)], [
+                f'{prefix}_{desc}.pdf',
+                f'{prefix}_{desc}.png',
+            ]))
+    if options.get('render_mode', 'both') in ('lod', 'both'):
+        stages.append(Stage(
+            'lod', export_lod, [graphfn, layout_path(prefix)], [lod_path(prefix)],
+            params=options.get('lod_score', 'pagerank')
         ))
-    # Plot quadrants
-    for weight in [True, False]:
-        desc = ('un'*int(not weight))+'weighted'
-        if not Path(f'{prefix}_quads_{desc}.pdf').exists() or not Path(f'{prefix}_quads_{desc}.png').exists():
-            key = 'weight' if weight else 'degree'
-            dimen_cutoff = draw_degree_quadrants(graph, metrics['degree'], key)
-            plt.savefig(f'{prefix}_quads_{desc}.pdf', bbox_inches='tight')
-            plt.savefig(f'{prefix}_quads_{desc}.png', bbox_inches='tight')
-            Path(f'{prefix}_quads_{desc}.json').write_text(json.dumps(dimen_cutoff, indent=4))
-    for weight in [True, False]:
+    if options.get('distances_json'):
+        stages.append(Stage(
+            'distances_json', export_distances_json_stage, distances,
+            [output_path(f'{prefix}_metrics_distances.json', compress)]
+        ))
+    for weight, plot, csvs in (
+        (True, export_quadrant_plot_weighted, export_quadrant_csvs_weighted),
+        (False, export_quadrant_plot_unweighted, export_quadrant_csvs_unweighted),
+    ):
         desc = ('un'*int(not weight))+'weighted'
-        if True or not Path(f'{prefix}_quads_{desc}.csv').exists():
-            key = 'weight' if weight else 'degree'
-            dimen_cutoff = json.loads(Path(f'{prefix}_quads_{desc}.json').read_text())
-            with open(f'{prefix}_quads_{desc}.csv', 'w') as file:
-                fmt = ','.join(['%s']*(4+int(weight)))+'\n'
-                hr = (dimen_cutoff['halfrange']['x'], dimen_cutoff['halfrange']['y'])
-                file.write(fmt % ("source", "target", *(["weight"]*int(weight)), "source_color", "target_color"))
-                for node in graph.values():
-                    node_src_nm = node['name']
-                    src_metric = metrics['degree'][node_src_nm]
-                    for node_dst_nm, frequency in node['mention_freq'].items():
-                        dst_metric = metrics['degree'][node_dst_nm]
-                        file.write(fmt % (
-                            graph[node_src_nm][label_key],
-                            graph[node_dst_nm][label_key],
-                            *([frequency]*int(weight)),
-                            QUADRANT_COLOR[get_quadrant(src_metric[f'{key}_in'], src_metric[f'{key}_out'], *hr)-1],
-                            QUADRANT_COLOR[get_quadrant(dst_metric[f'{key}_in'], dst_metric[f'{key}_out'], *hr)-1],
-                        ))
-            with open(f'{prefix}_quads_{desc}_nodst3rdquad.csv', 'w') as file:
-                fmt = ','.join(['%s']*(4+int(weight)))+'\n'
-                hr = (dimen_cutoff['halfrange']['x'], dimen_cutoff['halfrange']['y'])
-                file.write(fmt % ("source", "target", *(["weight"]*int(weight)), "source_color", "target_color"))
-                for node in graph.values():
-                    node_src_nm = node['name']
-                    src_metric = metrics['degree'][node_src_nm]
-                    for node_dst_nm, frequency in node['mention_freq'].items():
-                        dst_metric = metrics['degree'][node_dst_nm]
-                        if get_quadrant(dst_metric[f'{key}_in'], dst_metric[f'{key}_out'], *hr) == 3:
-                            continue
-                        file.write(fmt % (
-                            graph[node_src_nm][label_key],
-                            graph[node_dst_nm][label_key],
-                            *([frequency]*int(weight)),
-                            QUADRANT_COLOR[get_quadrant(src_metric[f'{key}_in'], src_metric[f'{key}_out'], *hr)-1],
-                            QUADRANT_COLOR[get_quadrant(dst_metric[f'{key}_in'], dst_metric[f'{key}_out'], *hr)-1],
-                        ))
-            with open(f'{prefix}_quads_{desc}_nosrc3rdquad.csv', 'w') as file:
-                fmt = ','.join(['%s']*(4+int(weight)))+'\n'
-                hr = (dimen_cutoff['halfrange']['x'], dimen_cutoff['halfrange']['y'])
-                file.write(fmt % ("source", "target", *(["weight"]*int(weight)), "source_color", "target_color"))
-                for node in graph.values():
-                    node_src_nm = node['name']
-                    src_metric = metrics['degree'][node_src_nm]
-                    if get_quadrant(src_metric[f'{key}_in'], src_metric[f'{key}_out'], *hr) == 3:
-                        continue
-                    for node_dst_nm, frequency in node['mention_freq'].items():
-                        dst_metric = metrics['degree'][node_dst_nm]
-                        file.write(fmt % (
-                            graph[node_src_nm][label_key],
-                            graph[node_dst_nm][label_key],
-                            *([frequency]*int(weight)),
-                            QUADRANT_COLOR[get_quadrant(src_metric[f'{key}_in'], src_metric[f'{key}_out'], *hr)-1],
-                            QUADRANT_COLOR[get_quadrant(dst_metric[f'{key}_in'], dst_metric[f'{key}_out'], *hr)-1],
-                        ))
-            with open(f'{prefix}_quads_{desc}_no3rdquad.csv', 'w') as file:
-                fmt = ','.join(['%s']*(4+int(weight)))+'\n'
-                hr = (dimen_cutoff['halfrange']['x'], dimen_cutoff['halfrange']['y'])
-                file.write(fmt % ("source", "target", *(["weight"]*int(weight)), "source_color", "target_color"))
-                for node in graph.values():
-                    node_src_nm = node['name']
-                    src_metric = metrics['degree'][node_src_nm]
-                    if get_quadrant(src_metric[f'{key}_in'], src_metric[f'{key}_out'], *hr) == 3:
-                        continue
-                    for node_dst_nm, frequency in node['mention_freq'].items():
-                        dst_metric = metrics['degree'][node_dst_nm]
-                        if get_quadrant(dst_metric[f'{key}_in'], dst_metric[f'{key}_out'], *hr) == 3:
-                            continue
-                        file.write(fmt % (
-                            graph[node_src_nm][label_key],
-                            graph[node_dst_nm][label_key],
-                            *([frequency]*int(weight)),
-                            QUADRANT_COLOR[get_quadrant(src_metric[f'{key}_in'], src_metric[f'{key}_out'], *hr)-1],
-                            QUADRANT_COLOR[get_quadrant(dst_metric[f'{key}_in'], dst_metric[f'{key}_out'], *hr)-1],
-                        ))
-    if True:
-        folder_out = Path(f'{prefix}_quads_unweighted_no2nd3rdquad')
-        folder_out.mkdir(parents=True, exist_ok=True)
-        for node in graph.values():
-            node_src_nm = node['name']
-            src_metric = metrics['degree'][node_src_nm]
-            if get_quadrant(src_metric[f'{key}_in'], src_metric[f'{key}_out'], *hr) in [2, 3]:
-                continue
-            with folder_out.joinpath(f'{node["generic_name"]}.csv').open('w') as file:
-                fmt = ','.join(['%s']*5)+'\n'
-                hr = (dimen_cutoff['halfrange']['x'], dimen_cutoff['halfrange']['y'])
-                file.write(fmt % ("source", "target", "source_color", "target_color", "similarity"))
-                srcWC = None
-                srcCacheKey = graph[node_src_nm]['filepath'][6:]
-                if len(srcCacheKey) > 0:
-                    srcDoc = PlainCachedDocument(srcCacheKey, None).parse(' ')
-                    srcWC = WordCounter(srcDoc)
-                for node_dst_nm, frequency in node['mention_freq'].items():
-                    dst_metric = metrics['degree'][node_dst_nm]
-                    # if get_quadrant(dst_metric[f'{key}_in'], dst_metric[f'{key}_out'], *hr) == 3:
-                    #     continue
-                    similarity = '?'
-                    dstCacheKey = graph[node_dst_nm]['filepath'][6:]
-                    if len(dstCacheKey) > 0:
-                        dstDoc = PlainCachedDocument(dstCacheKey, None).parse(' ')
-                        dstWC = WordCounter(dstDoc)
-                        if srcWC is not None:
-                            similarity = srcWC.vectorSimilarity(dstWC)
-                            similarity = str(similarity[0][0])
-                    file.write(fmt % (
-                        graph[node_src_nm][label_key],
-                        graph[node_dst_nm][label_key],
-                        QUADRANT_COLOR[get_quadrant(src_metric[f'{key}_in'], src_metric[f'{key}_out'], *hr)-1],
-                        QUADRANT_COLOR[get_quadrant(dst_metric[f'{key}_in'], dst_metric[f'{key}_out'], *hr)-1],
-                        similarity,
-                    ))
-    if True or not Path(f'{prefix}_pagerank.json').exists():
-        g = networkx.DiGraph(networkx.read_graphml(f'{prefix}_unweighted.graphml'))
-        pr = networkx.pagerank(g)
-        Path(f'{prefix}_pagerank.json').write_text(json.dumps(pr, indent=2))
-        spr = sorted([
-            (k, v) for k, v in pr.items()
-        ], key=lambda a: (-a[1], a[0]))
-        Path(f'{prefix}_pagerank_ranked.json').write_text(json.dumps(spr, indent=2))
-        # dirLink = {k: set(v['mention_freq'].keys()) for k, v in graph.items()}
-        revLink = {graph[k][label_key]: set() for k in graph.keys()}
-        for ks, v in graph.items():
-            ks = graph[ks][label_key]
-            for kd in v['mention_freq'].keys():
-                kd = graph[kd][label_key]
-                revLink[kd].add(ks)
-        sptr = {spr[0][0]: spr[0][0]}
-        for node, rank in spr[1:]:
-            maxNode = sorted([x for x in revLink[node] if x != node], key=lambda a: -pr[a])[0]
-            sptr[node] = maxNode
-        Path(f'{prefix}_pagerank_ranked_spannedtree.json').write_text(json.dumps(sptr, indent=2))
-        table = ["source,target,source_weight,target_weight"]
-        for ns, nd in sptr.items():
-            ws = "%.32f" % pr[ns]
-            wd = "%.32f" % pr[nd]
-            table.append(f"{ns},{nd},{ws},{wd}")
-        Path(f'{prefix}_pagerank_ranked_spannedtree.csv').write_text('\n'.join(table)+'\n')
+        stages.append(Stage(f'quads_plot_{desc}', plot, [graphfn], [
+            f'{prefix}_quads_{desc}.pdf',
+            f'{prefix}_quads_{desc}.png',
+            f'{prefix}_quads_{desc}.json',
+        ]))
+        stages.append(Stage(f'quads_csv_{desc}', csvs, [graphfn, f'{prefix}_quads_{desc}.json'], [
+            f'{prefix}_quads_{desc}{suffix}.csv' for suffix, _, _ in QUADRANT_SINKS
+        ]))
+    return stages
+
+
+def convert_outputs(prefix, temporal_context, distances_json=False, projected_from=None, compress_exports=False, workers=None, render_mode='both', lod_score='pagerank', near_duplicates=None, pagerank_warm_start=False):
+    Path("flavors.json").write_text(
+        json.dumps(
+            [
+                *json.loads(Path("flavors.json").read_text()),
+                prefix
+            ],
+            indent=4
+        )
+    )
+    options = {
+        'distances_json': distances_json,
+        'projected_from': projected_from,
+        'compress_exports': compress_exports,
+        'render_mode': render_mode,
+        'lod_score': lod_score,
+        'workers': workers,
+        'near_duplicates': near_duplicates,
+        'pagerank_warm_start': pagerank_warm_start,
+    }
+    StageScheduler(
+        prefix,
+        export_stages(prefix, temporal_context, options),
+        (prefix, temporal_context, options),
+        workers
+    ).run()
 
 
 def main():
     Path("flavors.json").write_text("[]")
     convert_outputs('graph', True)
-    convert_outputs('graph_noctx', False)
+    convert_outputs('graph_noctx', False, projected_from='graph')
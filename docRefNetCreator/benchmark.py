@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import sys
+import json
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+import networkx
+import numpy as np
+import matplotlib.pyplot as plt
+from . import dijkstra
+from .connectivity import embed_connectivity
+from .graph_core import GraphCore
+from .layout import Layout
+from .lod import render_lod
+from .snapshot import Snapshot
+from .snapshot import write_snapshot
+from .metrics import embed_degree_metrics
+from .pagerank import pagerank
+from .reachability import ReachabilityIndex
+from .sqlite_export import SQL_COLUMNS
+from .sqlite_export import write_sqlite
+from .shortest_paths import ShortestPaths
+from .tfidf_index import build_tfidf_index
+
+benchmarks = dict()
+
+
+def benchmark(fn):
+    benchmarks[fn.__name__[len('benchmark_'):]] = fn
+    return fn
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter()-start, result
+
+
+@benchmark
+def benchmark_tfidf_index(cachedir='plaincache', queries=100):
+    update_seconds, index = timed(build_tfidf_index, cachedir)
+    keys = index.keys[::max(1, len(index)//queries)][:queries]
+    latencies = sorted(timed(index.top_k, key)[0] for key in keys)
+    return {
+        'documents': len(index),
+        'build_seconds': index.build_seconds,
+        'update_seconds': update_seconds,
+        'index_bytes': index.size_bytes,
+        'queries': len(latencies),
+        'query_median_seconds': latencies[len(latencies)//2] if len(latencies) > 0 else None,
+        'query_max_seconds': latencies[-1] if len(latencies) > 0 else None,
+    }
+
+
+@benchmark
+def benchmark_shortest_paths(prefix='graph', sources=8):
+    graph = json.loads(Path(f'{prefix}.json').read_text())
+    core = GraphCore.from_graph(graph)
+    labels = core.labels
+    sample = list(range(len(labels)))
+    if sources is not None:
+        sample = sample[::max(1, len(labels)//sources)][:sources]
+    scale = len(labels)/len(sample)
+    results = {'nodes': len(labels), 'sources': len(sample)}
+    for hops_mode in (True, False):
+        legacy_seconds, legacy = timed(lambda: [dijkstra(graph, labels[s], hops_mode)[0] for s in sample])
+        engine = ShortestPaths(core.adjacency, hops_mode)
+        engine_seconds, rows = timed(lambda: [engine(s) for s in sample])
+        results['hops' if hops_mode else 'weight'] = {
+            'legacy_seconds': legacy_seconds,
+            'engine_seconds': engine_seconds,
+            'legacy_all_pairs_seconds': legacy_seconds*scale,
+            'engine_all_pairs_seconds': engine_seconds*scale,
+            'identical': all(
+                [visited.get(target, -1) for target in labels] == row
+                for visited, row in zip(legacy, rows)
+            ),
+        }
+    return results
+
+
+def legacy_embed_metrics(graph):
+    metrics = dict()
+    metrics['basic'] = dict()
+    metrics['basic']['node_count'] = len(graph)
+    metrics['basic']['vertex_count'] = 0
+    metrics['basic']['vertex_weight_sum'] = 0
+    for node in graph.values():
+        metrics['basic']['vertex_count'] += len(node['mention_freq'])
+        metrics['basic']['vertex_weight_sum'] += sum(node['mention_freq'].values())
+    metrics['matrix_labels'] = list(graph.keys())
+    metrics['degree'] = dict()
+    for key, node in graph.items():
+        metric = dict()
+        metric['degree_out'] = len(node['mention_freq'].values())
+        metric['weight_out'] = sum(node['mention_freq'].values())
+        metric['degree_in'] = 0
+        metric['weight_in'] = 0
+        for node2 in graph.values():
+            count = node2['mention_freq'].get(key, 0)
+            if count > 0:
+                metric['degree_in'] += 1
+                metric['weight_in'] += count
+        metrics['degree'][key] = metric
+    return metrics
+
+
+@benchmark
+def benchmark_degree_metrics(prefixes=('graph', 'graph_noctx')):
+    results = dict()
+    for prefix in prefixes:
+        graph = json.loads(Path(f'{prefix}.json').read_text())
+        legacy_seconds, legacy = timed(legacy_embed_metrics, graph)
+        core_seconds, core = timed(GraphCore.from_graph, graph)
+        vectorised_seconds, vectorised = timed(embed_degree_metrics, core)
+        results[prefix] = {
+            'legacy_seconds': legacy_seconds,
+            'core_build_seconds': core_seconds,
+            'vectorised_seconds': vectorised_seconds,
+            'identical': json.dumps(legacy, indent=2) == json.dumps(vectorised, indent=2),
+        }
+    return results
+
+
+@benchmark
+def benchmark_connectivity(prefixes=('graph', 'graph_noctx'), legacy=False):
+    results = dict()
+    for prefix in prefixes:
+        core = GraphCore.load(prefix)
+        engine_seconds, connectivity = timed(embed_connectivity, core)
+        results[prefix] = {
+            'nodes': len(core),
+            'scc_count': connectivity['scc_count'],
+            'engine_seconds': engine_seconds,
+            'connectivity': [connectivity['connectivity_edge'], connectivity['connectivity_node']],
+        }
+        if legacy:
+            g = networkx.DiGraph()
+            g.add_nodes_from(range(len(core)))
+            g.add_edges_from((src, dst) for src, dst, _ in core.edges())
+            legacy_seconds, expected = timed(lambda: [networkx.edge_connectivity(g), networkx.node_connectivity(g)])
+            results[prefix]['legacy_seconds'] = legacy_seconds
+            results[prefix]['identical'] = expected == results[prefix]['connectivity']
+    return results
+
+
+@benchmark
+def benchmark_pagerank(prefixes=('graph', 'graph_noctx')):
+    results = dict()
+    for prefix in prefixes:
+        core = GraphCore.load(prefix)
+        results[prefix] = {'nodes': len(core), 'edges': core.edge_count}
+        for weighted in (False, True):
+            g = networkx.DiGraph()
+            g.add_nodes_from(range(len(core)))
+            for src, dst, weight in core.edges():
+                g.add_edge(src, dst, **({'weight': weight} if weighted else {}))
+            legacy_seconds, legacy = timed(networkx.pagerank, g)
+            legacy = [legacy[node] for node in range(len(core))]
+            cold_seconds, (cold, cold_iterations) = timed(pagerank, core, weighted)
+            warm_seconds, (warm, warm_iterations) = timed(pagerank, core, weighted, nstart=cold)
+            results[prefix]['weighted' if weighted else 'unweighted'] = {
+                'networkx_seconds': legacy_seconds,
+                'cold_seconds': cold_seconds,
+                'cold_iterations': cold_iterations,
+                'warm_seconds': warm_seconds,
+                'warm_iterations': warm_iterations,
+                'max_abs_difference': max(abs(a-b) for a, b in zip(legacy, cold.tolist())),
+            }
+    return results
+
+
+@benchmark
+def benchmark_reachability(prefix='graph', queries=1000):
+    graph = json.loads(Path(f'{prefix}.json').read_text())
+    core = GraphCore.from_graph(graph)
+    build_seconds, index = timed(ReachabilityIndex.from_core, core)
+    labels = core.labels[::max(1, len(core)//queries)][:queries]
+    legacy_seconds, legacy = timed(lambda: [set(dijkstra(graph, label, True)[0].keys())-{label} for label in labels[:8]])
+    descendants_seconds, descendants = timed(lambda: [set(index.descendants_of(label)) for label in labels])
+    reaches_seconds, _ = timed(lambda: [index.reaches(labels[0], label) for label in labels])
+    return {
+        'nodes': len(core),
+        'components': index.component_count,
+        'build_seconds': build_seconds,
+        'legacy_query_seconds': legacy_seconds/len(legacy),
+        'descendants_query_seconds': descendants_seconds/len(labels),
+        'reaches_query_seconds': reaches_seconds/len(labels),
+        'identical': legacy == descendants[:len(legacy)],
+    }
+
+
+def edge_length_ratio(core, positions, samples=20000):
+    pairs = np.random.RandomState(0).randint(0, len(core), (samples, 2))
+    edges = np.sqrt(((positions[core.edge_src]-positions[core.edge_dst])**2).sum(axis=1)).mean()
+    return float(edges/np.sqrt(((positions[pairs[:, 0]]-positions[pairs[:, 1]])**2).sum(axis=1)).mean())
+
+
+@benchmark
+def benchmark_layout(prefixes=('graph', 'graph_noctx'), legacy=False):
+    results = dict()
+    for prefix in prefixes:
+        core = GraphCore.load(prefix)
+        engine_seconds, layout = timed(Layout.from_core, core)
+        results[prefix] = {
+            'nodes': len(core),
+            'edges': core.edge_count,
+            'engine_seconds': engine_seconds,
+            'engine_edge_length_ratio': edge_length_ratio(core, layout.positions),
+        }
+        if legacy:
+            g = networkx.Graph()
+            g.add_nodes_from(range(len(core)))
+            g.add_edges_from((src, dst) for src, dst, _ in core.edges())
+            legacy_seconds, legacy = timed(networkx.spring_layout, g, seed=0)
+            results[prefix]['legacy_seconds'] = legacy_seconds
+            results[prefix]['legacy_edge_length_ratio'] = edge_length_ratio(core, np.array([legacy[node] for node in range(len(core))]))
+    return results
+
+
+def folder_size(folder):
+    return sum(path.stat().st_size for path in Path(folder).iterdir())
+
+
+@benchmark
+def benchmark_lod(prefix='graph', legacy=False):
+    core = GraphCore.load(prefix)
+    layout = Layout.from_core(core)
+    results = {'nodes': len(core), 'edges': core.edge_count}
+    with tempfile.TemporaryDirectory() as folder:
+        for score in ('pagerank', 'degree'):
+            engine_seconds, index = timed(render_lod, core, layout, Path(folder, score), score)
+            results[score] = {
+                'seconds': engine_seconds,
+                'tiles': len(index['communities']),
+                'overview_edges': index['overview']['edges'],
+                'bytes': folder_size(Path(folder, score)),
+            }
+        if legacy:
+            def draw():
+                networkx.draw(core.to_networkx(), pos=layout.as_dict())
+                plt.savefig(str(Path(folder, 'full.png')))
+                plt.close()
+            results['legacy_seconds'], _ = timed(draw)
+            results['legacy_bytes'] = Path(folder, 'full.png').stat().st_size
+    return results
+
+
+@benchmark
+def benchmark_snapshot(prefixes=('graph', 'graph_noctx')):
+    results = dict()
+    with tempfile.TemporaryDirectory() as folder:
+        for prefix in prefixes:
+            text = Path(f'{prefix}.json').read_text()
+            json_seconds, core = timed(lambda: GraphCore.from_graph(json.loads(text)))
+            path = Path(folder, f'{prefix}.snapshot')
+            write_seconds, _ = timed(write_snapshot, path, json.loads(text))
+            open_seconds, snapshot = timed(Snapshot, path)
+            snapshot_seconds, loaded = timed(GraphCore.from_snapshot, snapshot)
+            results[prefix] = {
+                'json_bytes': len(text.encode('utf-8')),
+                'snapshot_bytes': path.stat().st_size,
+                'json_core_seconds': json_seconds,
+                'snapshot_write_seconds': write_seconds,
+                'snapshot_open_seconds': open_seconds,
+                'snapshot_core_seconds': snapshot_seconds,
+                'identical_core': loaded.labels == core.labels and loaded.columns == core.columns and list(loaded.edges()) == list(core.edges()),
+                'lossless': json.dumps(snapshot.to_graph()) == text,
+            }
+    return results
+
+
+def legacy_write_sqlite(path, core):
+    sqldb = sqlite3.connect(str(path))
+    cur = sqldb.cursor()
+    cur.execute('''CREATE TABLE node (name, generic_name, type, doc_id, monitored, pub_date, in_force)''')
+    cur.execute('''CREATE TABLE edge (node_src INTEGER, node_dst INTEGER, mentions INTEGER)''')
+    node_ids = list()
+    for node in range(len(core)):
+        cur.execute(
+            '''INSERT INTO node VALUES(?,?,?,?,?,?,?)''',
+            tuple(core.column(column)[node] for column in SQL_COLUMNS)
+        )
+        node_ids.append(cur.lastrowid)
+    for node_src, node_dst, frequency in core.edges():
+        cur.execute(
+            '''INSERT INTO edge(node_src,node_dst,mentions) VALUES(?,?,?)''',
+            (node_ids[node_src], node_ids[node_dst], frequency)
+        )
+    cur.close()
+    sqldb.commit()
+    return sqldb
+
+
+def query_latencies(sqldb, names):
+    cur = sqldb.cursor()
+    queries = {
+        'node_by_name': 'SELECT rowid FROM node WHERE name = ?',
+        'edges_by_src': 'SELECT node_dst FROM edge WHERE node_src = (SELECT rowid FROM node WHERE name = ?)',
+        'edges_by_dst': 'SELECT node_src FROM edge WHERE node_dst = (SELECT rowid FROM node WHERE name = ?)',
+    }
+    return {
+        query: timed(lambda: [cur.execute(sql, (name,)).fetchall() for name in names])[0]/len(names)
+        for query, sql in queries.items()
+    }
+
+
+@benchmark
+def benchmark_sqlite(prefix='graph', queries=200):
+    core = GraphCore.load(prefix)
+    names = core.column('name')[::max(1, len(core)//queries)][:queries]
+    results = {'nodes': len(core), 'edges': core.edge_count}
+    with tempfile.TemporaryDirectory() as folder:
+        legacy_seconds, legacy = timed(legacy_write_sqlite, Path(folder, 'legacy.db'), core)
+        results['legacy'] = {'load_seconds': legacy_seconds, 'query_seconds': query_latencies(legacy, names)}
+        legacy.close()
+        engine_seconds, (engine, _) = timed(write_sqlite, Path(folder, 'engine.db'), core, 'name')
+        results['engine'] = {'load_seconds': engine_seconds, 'query_seconds': query_latencies(engine, names)}
+        engine.close()
+        upsert_seconds, (upsert, _) = timed(write_sqlite, Path(folder, 'engine.db'), core, 'name', True)
+        results['engine']['upsert_seconds'] = upsert_seconds
+        results['engine']['rows_after_upsert'] = [
+            upsert.execute('SELECT COUNT(*) FROM node').fetchone()[0],
+            upsert.execute('SELECT COUNT(*) FROM edge').fetchone()[0],
+        ]
+        upsert.close()
+    return results
+
+
+def main():
+    names = sys.argv[1:] or list(benchmarks.keys())
+    for name in names:
+        print(f"Benchmark: {name}")
+        print(json.dumps(benchmarks[name](), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import itertools
+import multiprocessing
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from concurrent.futures import ProcessPoolExecutor
+
+_worker = dict()
+
+
+def without_self_loops(core):
+    keep = core.edge_src != core.edge_dst
+    return core.edge_src[keep], core.edge_dst[keep]
+
+
+def edge_flow_network(core):
+    src, dst = without_self_loops(core)
+    return sparse.csr_matrix(
+        (np.ones(len(src), dtype=np.int32), (src, dst)),
+        shape=(len(core), len(core))
+    )
+
+
+def node_flow_network(core):
+    size = len(core)
+    src, dst = without_self_loops(core)
+    nodes = np.arange(size, dtype=np.int32)
+    return sparse.csr_matrix(
+        (
+            np.concatenate([np.ones(size, dtype=np.int32), np.full(len(src), size, dtype=np.int32)]),
+            (np.concatenate([2*nodes, 2*src+1]), np.concatenate([2*nodes+1, 2*dst]))
+        ),
+        shape=(2*size, 2*size)
+    )
+
+
+def _init_worker(networks):
+    _worker['networks'] = networks
+
+
+def _flow_values(kind, pairs):
+    network = _worker['networks'][kind]
+    return [
+        csgraph.maximum_flow(network, source, sink, method='dinic').flow_value
+        for source, sink in pairs
+    ]
+
+
+def local_connectivities(networks, tasks, workers=None, chunksize=64):
+    chunks = [
+        (kind, pairs[start:start+chunksize])
+        for kind, pairs in tasks.items()
+        for start in range(0, len(pairs), chunksize)
+    ]
+    results = {kind: list() for kind in tasks}
+    if len(chunks) == 0:
+        return results
+    if workers == 1 or len(chunks) == 1:
+        _init_worker(networks)
+        for kind, pairs in chunks:
+            results[kind].extend(_flow_values(kind, pairs))
+        return results
+    with ProcessPoolExecutor(
+        workers or multiprocessing.cpu_count(),
+        initializer=_init_worker,
+        initargs=(networks,)
+    ) as ppe:
+        for (kind, _), values in zip(chunks, ppe.map(_flow_values, *zip(*chunks))):
+            results[kind].extend(values)
+    return results
+
+
+def connectivity_tasks(core):
+    size = len(core)
+    successors = [set(targets)-{node} for node, targets in enumerate(core.forward)]
+    predecessors = [set(sources)-{node} for node, sources in enumerate(core.reverse)]
+    degrees = [min(len(successors[node]), len(predecessors[node])) for node in range(size)]
+    pivot = min(range(size), key=lambda node: len(successors[node])+len(predecessors[node]))
+    node_pairs = list()
+    for other in range(size):
+        if other == pivot:
+            continue
+        if other not in successors[pivot]:
+            node_pairs.append((pivot, other))
+        if other not in predecessors[pivot]:
+            node_pairs.append((other, pivot))
+    for x, y in itertools.product(sorted(predecessors[pivot]), sorted(successors[pivot])):
+        if x != y and y not in successors[x]:
+            node_pairs.append((x, y))
+    return min(degrees), {
+        'edge': [(node, (node+1) % size) for node in range(size)],
+        'node': [(2*source+1, 2*sink) for source, sink in node_pairs],
+    }
+
+
+def flow_connectivity(core, workers=None):
+    min_degree, tasks = connectivity_tasks(core)
+    if min_degree <= 1:
+        return min_degree, min_degree
+    networks = {'edge': edge_flow_network(core), 'node': node_flow_network(core)}
+    results = local_connectivities(networks, tasks, workers)
+    return (
+        min([min_degree, *results['edge']]),
+        min([min_degree, *results['node']]),
+    )
+
+
+def articulation_points_and_bridges(core):
+    size = len(core)
+    neighbors = [
+        sorted((set(core.forward[node]) | set(core.reverse[node]))-{node})
+        for node in range(size)
+    ]
+    order = [-1]*size
+    low = [0]*size
+    articulation = set()
+    bridges = list()
+    counter = 0
+    for root in range(size):
+        if order[root] >= 0:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        root_children = 0
+        stack = [(root, -1, iter(neighbors[root]))]
+        while stack:
+            node, parent, children = stack[-1]
+            for child in children:
+                if child == parent:
+                    continue
+                if order[child] < 0:
+                    order[child] = low[child] = counter
+                    counter += 1
+                    stack.append((child, node, iter(neighbors[child])))
+                    break
+                low[node] = min(low[node], order[child])
+            else:
+                stack.pop()
+                if parent < 0:
+                    continue
+                low[parent] = min(low[parent], low[node])
+                if low[node] > order[parent]:
+                    bridges.append((parent, node))
+                if parent == root:
+                    root_children += 1
+                elif low[node] >= order[parent]:
+                    articulation.add(parent)
+        if root_children > 1:
+            articulation.add(root)
+    return sorted(articulation), sorted(bridges)
+
+
+def embed_connectivity(core, workers=None):
+    connectivity = dict()
+    count, components = core.components
+    sizes = np.bincount(components, minlength=count)
+    strongly_connected = len(core) > 0 and count == 1
+    if strongly_connected and len(core) > 1:
+        print('connectivity_flow')
+        edge, node = flow_connectivity(core, workers)
+    else:
+        edge = node = 0
+    connectivity['connectivity_edge'] = int(edge)
+    connectivity['connectivity_node'] = int(node)
+    connectivity['strongly_connected'] = bool(strongly_connected)
+    connectivity['scc_count'] = int(count)
+    connectivity['scc_sizes'] = sorted(sizes.tolist(), reverse=True)
+    connectivity['scc_largest'] = [core.labels[node] for node in np.flatnonzero(components == sizes.argmax())] if count > 0 else []
+    articulation, bridges = articulation_points_and_bridges(core)
+    connectivity['articulation_points'] = [core.labels[node] for node in articulation]
+    connectivity['bridges'] = [[core.labels[src], core.labels[dst]] for src, dst in bridges]
+    return connectivity
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import json
+from pathlib import Path
+
+from .document_finder import classes as docClasses
+
+CLASSES_BY_NAME = {cls.__name__: cls for cls in docClasses.values()}
+
+
+def crawl_path(grapfn):
+    grapfn = Path(grapfn)
+    return grapfn.with_name(f'{grapfn.stem}_crawl.json')
+
+
+def reference_key(reference):
+    return reference.__class__.__name__, reference._identifier
+
+
+class CrawlRecord:
+    def __init__(self, references=None):
+        self._references = dict() if references is None else references
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path)
+        if not path.exists():
+            return None
+        return cls({
+            docPath: [tuple(key) for key in keys]
+            for docPath, keys in json.loads(path.read_text())['references'].items()
+        })
+
+    def save(self, path):
+        Path(path).write_text(json.dumps({'references': self._references}))
+
+    def __len__(self):
+        return len(self._references)
+
+    def record(self, docPath, references):
+        self._references[str(docPath)] = [reference_key(reference) for reference in references]
+
+    def references(self, docPath):
+        return self._references.get(str(docPath))
+
+
+class ContextFreeResolver:
+    def __init__(self):
+        self._objects = dict()
+        self._cached = dict()
+        self._is_cached = dict()
+
+    def reference(self, key):
+        key = tuple(key)
+        reference = self._objects.get(key)
+        if reference is None:
+            reference = CLASSES_BY_NAME[key[0]](key[1])
+            self._objects[key] = reference
+        return reference
+
+    def without_temporal_context(self, reference):
+        return self.reference(reference_key(reference))
+
+    def cached(self, reference):
+        key = reference_key(reference)
+        if key not in self._cached:
+            self._cached[key] = reference.cached()
+        return self._cached[key]
+
+    def is_cached(self, reference):
+        key = reference_key(reference)
+        if key not in self._is_cached:
+            self._is_cached[key] = reference.is_cached()
+        return self._is_cached[key]
+
+    def stats(self):
+        return {'references': len(self._objects), 'resolved': len(self._cached)}
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+from collections import deque
+
+import numpy as np
+
+
+def strongly_connected_components(core):
+    return core.components
+
+
+def local_adjacency(adjacency, members):
+    local = {node: i for i, node in enumerate(members)}
+    return [
+        [local[target] for target in adjacency[node] if target in local]
+        for node in members
+    ]
+
+
+def hops_to(adjacency_reversed, goal):
+    distances = [len(adjacency_reversed)+1]*len(adjacency_reversed)
+    distances[goal] = 0
+    queue = deque([goal])
+    while queue:
+        node = queue.popleft()
+        for previous in adjacency_reversed[node]:
+            if distances[previous] > distances[node]+1:
+                distances[previous] = distances[node]+1
+                queue.append(previous)
+    return distances
+
+
+def _search(adjacency, start, goal, distances, max_length, max_count, materialize, yield_every_step):
+    found = 0
+    path = [start]
+    visited = 1 << start
+    stack = [iter(adjacency[start])]
+    while stack:
+        advanced = False
+        for child in stack[-1]:
+            length = len(path)
+            if max_length is not None and length+distances[child] > max_length:
+                continue
+            if child == goal:
+                found += 1
+                yield path+[goal] if materialize else length
+                if max_count is not None and found >= max_count:
+                    return
+                continue
+            if visited >> child & 1:
+                continue
+            path.append(child)
+            visited |= 1 << child
+            stack.append(iter(adjacency[child]))
+            if yield_every_step:
+                found += 1
+                yield list(path) if materialize else length
+                if max_count is not None and found >= max_count:
+                    return
+            advanced = True
+            break
+        if not advanced:
+            stack.pop()
+            visited &= ~(1 << path.pop())
+
+
+def cycles_through(core, root, max_length=None, max_count=None, materialize=True):
+    _, components = strongly_connected_components(core)
+    members = np.flatnonzero(components == components[root]).tolist()
+    forward = local_adjacency(core.forward, members)
+    backward = local_adjacency(core.reverse, members)
+    start = members.index(root)
+    distances = hops_to(backward, start)
+    for found in _search(forward, start, start, distances, max_length, max_count, materialize, False):
+        yield [members[node] for node in found] if materialize else found
+
+
+def paths_to(core, target, max_length=None, max_count=None, materialize=True):
+    reached = [False]*len(core)
+    reached[target] = True
+    queue = deque([target])
+    while queue:
+        node = queue.popleft()
+        for previous in core.reverse[node]:
+            if not reached[previous]:
+                reached[previous] = True
+                queue.append(previous)
+    members = [node for node in range(len(core)) if reached[node]]
+    backward = local_adjacency(core.reverse, members)
+    start = members.index(target)
+    distances = [0]*len(members)
+    for found in _search(backward, start, None, distances, max_length, max_count, materialize, True):
+        yield [members[node] for node in reversed(found)] if materialize else found
+
+
+def count_lengths(found):
+    histogram = dict()
+    for length in found:
+        histogram[length] = histogram.get(length, 0)+1
+    return {'total': sum(histogram.values()), 'by_length': dict(sorted(histogram.items()))}
+
+
+def count_cycles_through(core, root, max_length=None, max_count=None):
+    return count_lengths(cycles_through(core, root, max_length, max_count, materialize=False))
+
+
+def count_paths_to(core, target, max_length=None, max_count=None):
+    return count_lengths(paths_to(core, target, max_length, max_count, materialize=False))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import json
+import hashlib
+import multiprocessing
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+
+from .distance_store import MATRICES
+from .distance_store import labels_path
+from .distance_store import matrix_path
+from .distance_store import create_distance_matrices
+from .distance_store import write_distance_labels
+from .shortest_paths import ShortestPaths
+from .shortest_paths import adjacency_from_csr
+
+_worker = dict()
+
+
+def progress_path(prefix):
+    return Path(f'{prefix}_metrics_distances_progress.json')
+
+
+def distances_fingerprint(labels, indptr, indices, weights):
+    digest = hashlib.sha1(json.dumps(labels).encode('utf-8'))
+    for array in (indptr, indices, weights):
+        digest.update(array.dtype.str.encode('ascii'))
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def load_progress(prefix, core, tile_size):
+    fresh = {
+        'fingerprint': distances_fingerprint(core.labels, *core.csr()),
+        'tile_size': tile_size,
+        'done': {kind: list() for kind in MATRICES},
+    }
+    path = progress_path(prefix)
+    if not path.exists() or not all(matrix_path(prefix, kind).exists() for kind in MATRICES):
+        return fresh, False
+    progress = json.loads(path.read_text())
+    if progress['fingerprint'] != fresh['fingerprint'] or progress['tile_size'] != tile_size:
+        return fresh, False
+    return progress, True
+
+
+def save_progress(prefix, progress):
+    path = progress_path(prefix)
+    temp = path.with_name(path.name+'.tmp')
+    temp.write_text(json.dumps(progress))
+    temp.replace(path)
+
+
+def _init_worker(prefix, indptr, indices, weights):
+    _worker['prefix'] = prefix
+    _worker['adjacency'] = adjacency_from_csr(indptr, indices, weights)
+    _worker['matrices'] = dict()
+
+
+def _compute_tile(kind, start, stop):
+    matrices = _worker['matrices']
+    if kind not in matrices:
+        matrices[kind] = np.load(str(matrix_path(_worker['prefix'], kind)), mmap_mode='r+')
+    matrix = matrices[kind]
+    engine = ShortestPaths(_worker['adjacency'], kind == 'hops')
+    for source in range(start, stop):
+        matrix[source] = engine(source)
+    matrix.flush()
+    return kind, start, stop
+
+
+def compute_distance_blocks(core, prefix, tile_size=256, workers=None):
+    labels = core.labels
+    progress, resuming = load_progress(prefix, core, tile_size)
+    if labels_path(prefix).exists():
+        labels_path(prefix).unlink()
+    if resuming:
+        print(f"Resuming distance tiles: {sum(map(len, progress['done'].values()))} already done")
+    else:
+        create_distance_matrices(prefix, labels)
+        save_progress(prefix, progress)
+    tiles = [
+        (kind, start, min(start+tile_size, len(labels)))
+        for kind in MATRICES
+        for start in range(0, len(labels), tile_size)
+        if start not in progress['done'][kind]
+    ]
+    with ProcessPoolExecutor(
+        workers or multiprocessing.cpu_count(),
+        initializer=_init_worker,
+        initargs=(prefix, *core.csr())
+    ) as tpe:
+        futures = [tpe.submit(_compute_tile, *tile) for tile in tiles]
+        for pending, future in enumerate(as_completed(futures), 1):
+            kind, start, stop = future.result()
+            progress['done'][kind].append(start)
+            save_progress(prefix, progress)
+            print(f"Distance tile {kind} [{start}, {stop}) // Pending: {len(futures)-pending}")
+    write_distance_labels(prefix, labels)
+    progress_path(prefix).unlink()
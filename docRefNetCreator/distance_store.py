@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import json
+import numpy as np
+from pathlib import Path
+
+from .streaming import iter_json_matrices
+from .streaming import write_chunks
+
+MATRICES = ('hops', 'weight')
+
+
+def matrix_path(prefix, kind):
+    return Path(f'{prefix}_metrics_distances_{kind}.npy')
+
+
+def labels_path(prefix):
+    return Path(f'{prefix}_metrics_distances_labels.json')
+
+
+def distances_exist(prefix):
+    return labels_path(prefix).exists() and all(matrix_path(prefix, kind).exists() for kind in MATRICES)
+
+
+def write_distance_labels(prefix, labels):
+    path = labels_path(prefix)
+    temp = path.with_name(path.name+'.tmp')
+    temp.write_text(json.dumps(labels))
+    temp.replace(path)
+
+
+def create_distance_matrices(prefix, labels, mode='w+'):
+    return {
+        kind: np.lib.format.open_memmap(
+            str(matrix_path(prefix, kind)),
+            mode=mode,
+            dtype=np.int32,
+            shape=(len(labels), len(labels))
+        )
+        for kind in MATRICES
+    }
+
+
+class DistanceMatrix:
+    def __init__(self, prefix, kind='hops'):
+        self.labels = json.loads(labels_path(prefix).read_text())
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        self.matrix = np.load(str(matrix_path(prefix, kind)), mmap_mode='r')
+
+    def __len__(self):
+        return len(self.labels)
+
+    def distance(self, src, dst):
+        distance = int(self.matrix[self.index[src], self.index[dst]])
+        return None if distance < 0 else distance
+
+    def row(self, src):
+        return self.matrix[self.index[src]]
+
+    def column(self, dst):
+        return self.matrix[:, self.index[dst]]
+
+    def reachable(self, src):
+        row = np.asarray(self.row(src))
+        return {self.labels[i]: int(row[i]) for i in np.flatnonzero(row >= 0)}
+
+
+def export_distances_json(prefix, path=None, compress=False):
+    path = Path(f'{prefix}_metrics_distances.json') if path is None else Path(path)
+    matrices = {kind: DistanceMatrix(prefix, kind).matrix for kind in MATRICES}
+    write_chunks(path, iter_json_matrices({
+        f'distance_matrix_{kind}': matrix
+        for kind, matrix in matrices.items()
+    }), compress)
@@ -26,4 +26,6 @@ class PlainCachedDocument:
             cached = (self._class(*self._args, **self._kwargs)).parse(None)
             cached_disk.parent.mkdir(parents=True, exist_ok=True)
             cached_disk.write_text(json.dumps(cached))
+        if cst_eol is None:
+            return cached
         return cst_eol.join(cached)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import json
+import networkx
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from pathlib import Path
+
+from .shortest_paths import adjacency_from_csr
+from .snapshot import Snapshot
+from .snapshot import is_fresh
+
+NODE_COLUMNS = (
+    'name',
+    'generic_name',
+    'type',
+    'doc_id',
+    'monitored',
+    'pub_date',
+    'in_force',
+    'filepath',
+)
+
+
+class GraphCore:
+    def __init__(self, labels, columns, edge_src, edge_dst, edge_weight):
+        self.labels = list(labels)
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        self.columns = columns
+        self.edge_src = np.asarray(edge_src, dtype=np.int32)
+        self.edge_dst = np.asarray(edge_dst, dtype=np.int32)
+        self.edge_weight = np.asarray(edge_weight, dtype=np.int64)
+        size = len(self.labels)
+        out_order = np.argsort(self.edge_src, kind='stable')
+        self.out_ptr = np.concatenate([[0], np.cumsum(np.bincount(self.edge_src, minlength=size))]).astype(np.int64)
+        self.out_dst = self.edge_dst[out_order]
+        self.out_weight = self.edge_weight[out_order]
+        in_order = np.argsort(self.edge_dst, kind='stable')
+        self.in_ptr = np.concatenate([[0], np.cumsum(np.bincount(self.edge_dst, minlength=size))]).astype(np.int64)
+        self.in_src = self.edge_src[in_order]
+        self.in_weight = self.edge_weight[in_order]
+        self._adjacency = None
+        self._forward = None
+        self._reverse = None
+        self._transition_map = None
+        self._components = None
+
+    @classmethod
+    def from_graph(cls, graph, labels=None):
+        labels = list(graph.keys()) if labels is None else list(labels)
+        index = {label: i for i, label in enumerate(labels)}
+        columns = {column: [graph[label][column] for label in labels] for column in NODE_COLUMNS}
+        edge_src = list()
+        edge_dst = list()
+        edge_weight = list()
+        for src, label in enumerate(labels):
+            for target, weight in graph[label]['mention_freq'].items():
+                edge_src.append(src)
+                edge_dst.append(index[target])
+                edge_weight.append(weight)
+        return cls(labels, columns, edge_src, edge_dst, edge_weight)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls(
+            snapshot.keys,
+            {column: snapshot.column(column) for column in NODE_COLUMNS},
+            snapshot.edge_src,
+            snapshot.edge_dst,
+            snapshot.edge_weight
+        )
+
+    @classmethod
+    def load(cls, prefix):
+        if is_fresh(prefix):
+            return cls.from_snapshot(Snapshot.load(prefix))
+        return cls.from_graph(json.loads(Path(f'{prefix}.json').read_text()))
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def edge_count(self):
+        return len(self.edge_src)
+
+    def column(self, name):
+        return self.columns[name]
+
+    def out_edges(self, node):
+        start, stop = self.out_ptr[node], self.out_ptr[node+1]
+        return self.out_dst[start:stop], self.out_weight[start:stop]
+
+    def in_edges(self, node):
+        start, stop = self.in_ptr[node], self.in_ptr[node+1]
+        return self.in_src[start:stop], self.in_weight[start:stop]
+
+    def edges(self):
+        return zip(self.edge_src.tolist(), self.edge_dst.tolist(), self.edge_weight.tolist())
+
+    def csr(self):
+        return self.out_ptr, self.out_dst, self.out_weight
+
+    def projected(self, labels):
+        unique = list(dict.fromkeys(labels))
+        if len(unique) == len(self.labels):
+            return GraphCore(unique, self.columns, self.edge_src, self.edge_dst, self.edge_weight)
+        index = {label: i for i, label in enumerate(unique)}
+        mapping = [index[label] for label in labels]
+        first = dict()
+        for node, target in enumerate(mapping):
+            first.setdefault(target, node)
+        columns = {name: [values[first[node]] for node in range(len(unique))] for name, values in self.columns.items()}
+        edges = dict()
+        for src, dst, weight in self.edges():
+            edges[(mapping[src], mapping[dst])] = weight
+        edge_src, edge_dst = zip(*edges.keys()) if len(edges) > 0 else ((), ())
+        return GraphCore(unique, columns, edge_src, edge_dst, list(edges.values()))
+
+    def to_networkx(self, weighted=True):
+        g = networkx.DiGraph()
+        g.add_nodes_from(self.labels)
+        if weighted:
+            g.add_weighted_edges_from(
+                (self.labels[src], self.labels[dst], weight) for src, dst, weight in self.edges()
+            )
+        else:
+            g.add_edges_from((self.labels[src], self.labels[dst]) for src, dst, _ in self.edges())
+        return g
+
+    @property
+    def adjacency(self):
+        if self._adjacency is None:
+            self._adjacency = adjacency_from_csr(*self.csr())
+        return self._adjacency
+
+    @property
+    def forward(self):
+        if self._forward is None:
+            out_ptr = self.out_ptr.tolist()
+            out_dst = self.out_dst.tolist()
+            self._forward = tuple(
+                tuple(out_dst[out_ptr[i]:out_ptr[i+1]])
+                for i in range(len(self.labels))
+            )
+        return self._forward
+
+    @property
+    def reverse(self):
+        if self._reverse is None:
+            in_ptr = self.in_ptr.tolist()
+            in_src = self.in_src.tolist()
+            self._reverse = tuple(
+                tuple(in_src[in_ptr[i]:in_ptr[i+1]])
+                for i in range(len(self.labels))
+            )
+        return self._reverse
+
+    @property
+    def transition_map(self):
+        if self._transition_map is None:
+            self._transition_map = {
+                self.labels[target]: [self.labels[source] for source in sources]
+                for target, sources in enumerate(self.reverse)
+                if len(sources) > 0
+            }
+        return self._transition_map
+
+    @property
+    def components(self):
+        if self._components is None:
+            matrix = sparse.csr_matrix(
+                (np.ones(len(self.out_dst), dtype=np.int8), self.out_dst, self.out_ptr),
+                shape=(len(self), len(self))
+            )
+            self._components = csgraph.connected_components(matrix, directed=True, connection='strong')
+        return self._components
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import json
+import numpy as np
+from pathlib import Path
+from scipy import sparse
+
+COARSEST_SIZE = 256
+EXACT_LIMIT = 1024
+GRID_CELLS = (8, 48)
+CHUNK_SIZE = 1024
+LEVEL_ITERATIONS = (300, 30)
+
+
+def layout_path(prefix):
+    return Path(f'{prefix}_layout.npz')
+
+
+def structural_adjacency(count, edge_src, edge_dst):
+    keep = edge_src != edge_dst
+    matrix = sparse.coo_matrix(
+        (np.ones(int(keep.sum())), (edge_src[keep], edge_dst[keep])),
+        shape=(count, count)
+    ).tocsr()
+    matrix = ((matrix+matrix.T) > 0).astype(np.float64)
+    return matrix.tocsr()
+
+
+def coarsen(adjacency, rng):
+    count = adjacency.shape[0]
+    groups = np.full(count, -1, dtype=np.int64)
+    indptr, indices, data = adjacency.indptr, adjacency.indices, adjacency.data
+    size = 0
+    for node in rng.permutation(count):
+        if groups[node] >= 0:
+            continue
+        neighbours = indices[indptr[node]:indptr[node+1]]
+        free = groups[neighbours] < 0
+        if free.any():
+            partner = neighbours[free][np.argmax(data[indptr[node]:indptr[node+1]][free])]
+            groups[node] = groups[partner] = size
+            size += 1
+        elif len(neighbours) == 1:
+            groups[node] = groups[neighbours[0]]
+        else:
+            groups[node] = size
+            size += 1
+    return groups, size
+
+
+def hierarchy(adjacency, rng):
+    levels = [(adjacency, np.ones(adjacency.shape[0]), None)]
+    while levels[-1][0].shape[0] > COARSEST_SIZE:
+        fine, mass, _ = levels[-1]
+        groups, size = coarsen(fine, rng)
+        if size > 0.95*fine.shape[0]:
+            break
+        projection = sparse.csr_matrix(
+            (np.ones(len(groups)), (np.arange(len(groups)), groups)),
+            shape=(len(groups), size)
+        )
+        coarse = (projection.T @ fine @ projection).tocsr()
+        coarse.setdiag(0)
+        coarse.eliminate_zeros()
+        levels.append((coarse, projection.T @ mass, groups))
+    return levels
+
+
+def squared_distances(a, b):
+    return np.maximum((a**2).sum(axis=1)[:, None]+(b**2).sum(axis=1)[None, :]-2*a@b.T, 1e-12)
+
+
+def exact_repulsion(pos, mass):
+    pos = pos-pos.mean(axis=0)
+    scale = mass[None, :]/squared_distances(pos, pos)
+    np.fill_diagonal(scale, 0)
+    return pos*scale.sum(axis=1)[:, None]-scale@pos
+
+
+def neighbour_cells(coords, cells):
+    lookup = np.full((cells+2)*(cells+2), -1, dtype=np.int64)
+    lookup[(coords[:, 0]+1)*(cells+2)+coords[:, 1]+1] = np.arange(len(coords))
+    return [
+        lookup[(coords[:, 0]+1+dx)*(cells+2)+coords[:, 1]+1+dy]
+        for dx in (-1, 0, 1)
+        for dy in (-1, 0, 1)
+    ]
+
+
+def neighbour_pairs(neighbours, own):
+    order = np.argsort(own, kind='stable')
+    sizes = np.bincount(own, minlength=len(neighbours[0]))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    src = list()
+    dst = list()
+    for other in neighbours:
+        other = other[own]
+        nodes = np.flatnonzero(other >= 0)
+        repeats = sizes[other[nodes]]
+        offsets = np.arange(repeats.sum())-np.repeat(np.cumsum(repeats)-repeats, repeats)
+        src.append(np.repeat(nodes, repeats))
+        dst.append(order[np.repeat(starts[other[nodes]], repeats)+offsets])
+    src = np.concatenate(src)
+    dst = np.concatenate(dst)
+    keep = src != dst
+    return src[keep], dst[keep]
+
+
+def grid_repulsion(pos, mass, cells=None):
+    if cells is None:
+        cells = int(np.clip(np.sqrt(len(pos))/2, *GRID_CELLS))
+    cuts = np.linspace(0, 1, cells+1)[1:-1]
+    cell = np.stack([
+        np.searchsorted(np.quantile(pos[:, axis], cuts), pos[:, axis], side='right')
+        for axis in range(2)
+    ], axis=1)
+    ids = cell[:, 0]*cells+cell[:, 1]
+    cell_mass = np.bincount(ids, weights=mass, minlength=cells*cells)
+    occupied = np.flatnonzero(cell_mass > 0)
+    centroid = np.stack([
+        np.bincount(ids, weights=mass*pos[:, axis], minlength=cells*cells)[occupied]
+        for axis in range(2)
+    ], axis=1)/cell_mass[occupied, None]
+    cell_mass = cell_mass[occupied]
+    own = np.searchsorted(occupied, ids)
+    neighbours = neighbour_cells(np.stack([occupied//cells, occupied % cells], axis=1), cells)
+    far = np.zeros((len(occupied), 3))
+    for start in range(0, len(occupied), CHUNK_SIZE):
+        block = slice(start, start+CHUNK_SIZE)
+        scale = cell_mass[None, :]/squared_distances(centroid[block], centroid)
+        for other in neighbours:
+            rows = np.flatnonzero(other[block] >= 0)
+            scale[rows, other[block][rows]] = 0
+        far[block, 0] = scale.sum(axis=1)
+        far[block, 1:] = scale@centroid
+    force = pos*far[own, :1]-far[own, 1:]
+    src, dst = neighbour_pairs(neighbours, own)
+    delta = pos[src]-pos[dst]
+    push = delta*(mass[dst]/np.maximum((delta**2).sum(axis=1), 1e-12))[:, None]
+    for axis in range(2):
+        force[:, axis] += np.bincount(src, weights=push[:, axis], minlength=len(pos))
+    return force
+
+
+def attraction(pos, upper, k):
+    delta = pos[upper.row]-pos[upper.col]
+    pull = delta*(np.sqrt((delta**2).sum(axis=1))*upper.data/k)[:, None]
+    force = np.zeros_like(pos)
+    for axis in range(2):
+        force[:, axis] -= np.bincount(upper.row, weights=pull[:, axis], minlength=len(pos))
+        force[:, axis] += np.bincount(upper.col, weights=pull[:, axis], minlength=len(pos))
+    return force
+
+
+def refine(pos, adjacency, mass, k, iterations):
+    repulsion = exact_repulsion if len(pos) <= EXACT_LIMIT else grid_repulsion
+    upper = sparse.triu(adjacency, k=1).tocoo()
+    extent = max(float(np.ptp(pos, axis=0).max()), k)
+    for temperature in np.linspace(0.1*extent, 0.1*extent/iterations, iterations):
+        force = k*k*repulsion(pos, mass)+attraction(pos, upper, k)/mass[:, None]
+        length = np.maximum(np.sqrt((force**2).sum(axis=1)), 1e-12)
+        pos += force*(np.minimum(length, temperature)/length)[:, None]
+    return pos
+
+
+def force_directed(count, edge_src, edge_dst, seed=0):
+    rng = np.random.RandomState(seed)
+    if count == 0:
+        return np.zeros((0, 2))
+    levels = hierarchy(structural_adjacency(count, edge_src, edge_dst), rng)
+    k = np.sqrt(1.0/count)
+    adjacency, mass, _ = levels[-1]
+    pos = rng.uniform(0, 1, (adjacency.shape[0], 2))
+    pos = refine(pos, adjacency, mass, k, LEVEL_ITERATIONS[0])
+    for depth in range(len(levels)-1, 0, -1):
+        groups = levels[depth][2]
+        adjacency, mass, _ = levels[depth-1]
+        pos = pos[groups]+rng.uniform(-0.1*k, 0.1*k, (len(groups), 2))
+        pos = refine(pos, adjacency, mass, k, LEVEL_ITERATIONS[1])
+    pos -= pos.mean(axis=0)
+    return pos/max(float(np.abs(pos).max()), 1e-12)
+
+
+class Layout:
+    def __init__(self, labels, edge_src, edge_dst, positions=None):
+        self.labels = list(labels)
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        self.edge_src = np.asarray(edge_src, dtype=np.int32)
+        self.edge_dst = np.asarray(edge_dst, dtype=np.int32)
+        if positions is None:
+            positions = force_directed(len(self.labels), self.edge_src, self.edge_dst)
+        self.positions = np.asarray(positions, dtype=np.float64)
+
+    @classmethod
+    def from_core(cls, core):
+        return cls(core.labels, core.edge_src, core.edge_dst)
+
+    @classmethod
+    def load(cls, prefix):
+        with np.load(str(layout_path(prefix))) as data:
+            return cls(
+                json.loads(str(data['labels'])),
+                data['edge_src'],
+                data['edge_dst'],
+                data['positions'],
+            )
+
+    def save(self, prefix):
+        path = layout_path(prefix)
+        temp = path.with_name(path.name+'.tmp.npz')
+        np.savez_compressed(
+            str(temp),
+            labels=np.array(json.dumps(self.labels)),
+            edge_src=self.edge_src,
+            edge_dst=self.edge_dst,
+            positions=self.positions,
+        )
+        temp.replace(path)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def matches(self, core):
+        return self.labels == core.labels and np.array_equal(self.edge_src, core.edge_src) and np.array_equal(self.edge_dst, core.edge_dst)
+
+    def position(self, label):
+        return self.positions[self.index[label]]
+
+    def as_dict(self):
+        return {label: tuple(xy) for label, xy in zip(self.labels, self.positions.tolist())}
+
+    def graphml_pos(self, label):
+        x, y = self.position(label)
+        return f'{x:.6f},{y:.6f}'
+
+    def graphviz_pos(self, label):
+        x, y = self.position(label)*72*np.sqrt(max(len(self), 1))
+        return f'{x:.2f},{y:.2f}!'
+
+
+def build_layout(core, prefix):
+    path = layout_path(prefix)
+    if path.exists():
+        layout = Layout.load(prefix)
+        if layout.matches(core):
+            return layout
+    layout = Layout.from_core(core)
+    layout.save(prefix)
+    return layout
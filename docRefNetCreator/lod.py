@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import json
+import networkx
+import numpy as np
+import matplotlib.pyplot as plt
+from pathlib import Path
+from scipy import sparse
+from scipy.spatial import cKDTree
+from matplotlib.collections import LineCollection
+
+from .pagerank import pagerank
+
+TOP_NODES = 200
+MAX_EDGES = 2000
+MAX_TILES = 24
+TILE_NODES = 150
+MAX_LABELS = 20
+FIGURE_SIZE = (8, 8)
+FIGURE_DPI = 100
+PALETTE = plt.get_cmap('tab20').colors
+OTHER_COLOR = '#B0B0B0'
+
+
+def lod_path(prefix):
+    return Path(f'{prefix}_lod')
+
+
+def node_scores(core, score='pagerank'):
+    if score == 'pagerank':
+        return pagerank(core)[0]
+    if score == 'degree':
+        return (np.diff(core.out_ptr)+np.diff(core.in_ptr)).astype(np.float64)
+    raise ValueError(f"Unknown level-of-detail score: {score}")
+
+
+def communities(core, seed=0):
+    keep = core.edge_src != core.edge_dst
+    matrix = sparse.coo_matrix(
+        (core.edge_weight[keep].astype(np.float64), (core.edge_src[keep], core.edge_dst[keep])),
+        shape=(len(core), len(core))
+    ).tocsr()
+    parts = networkx.community.louvain_communities(
+        networkx.from_scipy_sparse_array(matrix+matrix.T),
+        weight='weight',
+        seed=seed
+    )
+    membership = np.zeros(len(core), dtype=np.int64)
+    for community, members in enumerate(parts):
+        membership[list(members)] = community
+    return membership
+
+
+def ranked_communities(membership, scores):
+    mass = np.bincount(membership, weights=scores)
+    order = np.argsort(-mass, kind='stable')
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return rank[membership], mass[order]
+
+
+def aggregate_edges(core, groups):
+    inside = (groups[core.edge_src] >= 0) & (groups[core.edge_dst] >= 0)
+    src = groups[core.edge_src[inside]]
+    dst = groups[core.edge_dst[inside]]
+    count = int(groups.max())+1 if len(groups) > 0 else 0
+    matrix = sparse.coo_matrix(
+        (core.edge_weight[inside].astype(np.float64), (src, dst)),
+        shape=(count, count)
+    )
+    matrix.sum_duplicates()
+    keep = matrix.row != matrix.col
+    order = np.argsort(-matrix.data[keep], kind='stable')[:MAX_EDGES]
+    return matrix.row[keep][order], matrix.col[keep][order], matrix.data[keep][order]
+
+
+def summarize(core, positions, scores, units, top, mask=None):
+    mask = np.ones(len(core), dtype=bool) if mask is None else mask
+    weights = (scores+1e-12)*mask
+    count = int(units.max())+1
+    mass = np.bincount(units, weights=weights, minlength=count)
+    centers = np.stack([
+        np.bincount(units, weights=weights*positions[:, axis], minlength=count)
+        for axis in range(2)
+    ], axis=1)/np.maximum(mass, 1e-300)[:, None]
+    present = np.unique(units[mask])
+    kept = present[np.argsort(-mass[present], kind='stable')[:top]]
+    slot = np.full(count, -1, dtype=np.int64)
+    slot[present] = cKDTree(centers[kept]).query(centers[present])[1]
+    slot[kept] = np.arange(len(kept))
+    groups = np.where(mask, slot[units], -1)
+    order = np.flatnonzero(mask)[np.argsort(-scores[mask], kind='stable')]
+    _, first = np.unique(groups[order], return_index=True)
+    return {
+        'positions': centers[kept],
+        'mass': np.bincount(groups[mask], weights=weights[mask], minlength=len(kept)),
+        'members': np.bincount(groups[mask], minlength=len(kept)),
+        'heads': order[first],
+        'groups': groups,
+        'edges': aggregate_edges(core, groups),
+    }
+
+
+def summary_labels(core, summary):
+    return [
+        core.labels[head]+('' if members == 1 else f' (+{members-1})')
+        for head, members in zip(summary['heads'], summary['members'])
+    ]
+
+
+def community_color(community):
+    return PALETTE[community] if community < len(PALETTE) else OTHER_COLOR
+
+
+def draw_summary(path, summary, labels, colors, title):
+    figure, axes = plt.subplots(figsize=FIGURE_SIZE, dpi=FIGURE_DPI)
+    positions = summary['positions']
+    src, dst, weight = summary['edges']
+    if len(src) > 0:
+        axes.add_collection(LineCollection(
+            np.stack([positions[src], positions[dst]], axis=1),
+            linewidths=0.2+2*np.log1p(weight)/np.log1p(weight.max()),
+            colors='#606060',
+            alpha=0.25,
+            zorder=1,
+        ))
+    mass = summary['mass']
+    axes.scatter(
+        positions[:, 0],
+        positions[:, 1],
+        s=8+292*np.sqrt(mass/max(mass.max(), 1e-300)),
+        c=colors,
+        edgecolors='none',
+        zorder=2,
+    )
+    for position in np.argsort(-mass, kind='stable')[:MAX_LABELS]:
+        axes.annotate(labels[position], positions[position], fontsize=5, zorder=3)
+    axes.set_title(title, fontsize=8)
+    axes.set_axis_off()
+    axes.autoscale_view()
+    figure.savefig(str(path), bbox_inches='tight')
+    plt.close(figure)
+
+
+def render_lod(core, layout, folder, score='pagerank', top=TOP_NODES, tiles=MAX_TILES, tile_nodes=TILE_NODES):
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    for stale in folder.glob('community_*.png'):
+        stale.unlink()
+    positions = layout.positions[[layout.index[label] for label in core.labels]]
+    scores = node_scores(core, score)
+    membership, community_mass = ranked_communities(communities(core), scores)
+    _, components = core.components
+    overview = summarize(core, positions, scores, components, top)
+    draw_summary(
+        folder.joinpath('overview.png'),
+        overview,
+        summary_labels(core, overview),
+        [community_color(community) for community in membership[overview['heads']]],
+        f'{len(core)} nodes, {core.edge_count} edges; top {len(overview["heads"])} SCCs by {score}',
+    )
+    index = {
+        'score': score,
+        'nodes': len(core),
+        'edges': core.edge_count,
+        'overview': {
+            'file': 'overview.png',
+            'units': summary_labels(core, overview),
+            'edges': len(overview['edges'][0]),
+        },
+        'communities': list(),
+    }
+    nodes = np.arange(len(core))
+    for community in range(min(tiles, len(community_mass))):
+        mask = membership == community
+        tile = summarize(core, positions, scores, nodes, tile_nodes, mask)
+        outgoing = int((mask[core.edge_src] & ~mask[core.edge_dst]).sum())
+        incoming = int((~mask[core.edge_src] & mask[core.edge_dst]).sum())
+        filename = f'community_{community:03d}.png'
+        draw_summary(
+            folder.joinpath(filename),
+            tile,
+            summary_labels(core, tile),
+            [community_color(community)]*len(tile['heads']),
+            f'community {community}: {int(mask.sum())} nodes, {incoming} in / {outgoing} out edges',
+        )
+        index['communities'].append({
+            'id': community,
+            'file': filename,
+            'size': int(mask.sum()),
+            'score': float(community_mass[community]),
+            'incoming_edges': incoming,
+            'outgoing_edges': outgoing,
+            'top': summary_labels(core, tile)[:MAX_LABELS],
+        })
+    folder.joinpath('index.json').write_text(json.dumps(index, indent=2))
+    return index
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import numpy as np
+
+DEGREE_KEYS = ('degree_out', 'weight_out', 'degree_in', 'weight_in')
+
+
+def degree_arrays(core):
+    size = len(core)
+    arrays = {key: np.zeros(size, dtype=np.int64) for key in DEGREE_KEYS}
+    np.add.at(arrays['degree_out'], core.edge_src, 1)
+    np.add.at(arrays['weight_out'], core.edge_src, core.edge_weight)
+    np.add.at(arrays['degree_in'], core.edge_dst, 1)
+    np.add.at(arrays['weight_in'], core.edge_dst, core.edge_weight)
+    return arrays
+
+
+def embed_degree_metrics(core, arrays=None):
+    if arrays is None:
+        arrays = degree_arrays(core)
+    metrics = dict()
+    metrics['basic'] = dict()
+    metrics['basic']['node_count'] = len(core)
+    metrics['basic']['vertex_count'] = core.edge_count
+    metrics['basic']['vertex_weight_sum'] = int(core.edge_weight.sum())
+    metrics['matrix_labels'] = list(core.labels)
+    columns = [arrays[key].tolist() for key in DEGREE_KEYS]
+    metrics['degree'] = {
+        label: dict(zip(DEGREE_KEYS, values))
+        for label, values in zip(core.labels, zip(*columns))
+    }
+    return metrics
+
+
+def describe(values):
+    if len(values) == 0:
+        return None
+    return {
+        'min': int(values.min()),
+        'max': int(values.max()),
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'median': float(np.median(values)),
+        'p90': float(np.percentile(values, 90)),
+        'p99': float(np.percentile(values, 99)),
+        'zeros': int((values == 0).sum()),
+    }
+
+
+def summary_statistics(core, arrays=None):
+    if arrays is None:
+        arrays = degree_arrays(core)
+    size = len(core)
+    summary = {key: describe(arrays[key]) for key in DEGREE_KEYS}
+    summary['self_loops'] = int((core.edge_src == core.edge_dst).sum())
+    summary['density'] = core.edge_count/(size*size) if size > 0 else 0.0
+    summary['sinks'] = int(((arrays['degree_out'] == 0) & (arrays['degree_in'] > 0)).sum())
+    summary['sources'] = int(((arrays['degree_in'] == 0) & (arrays['degree_out'] > 0)).sum())
+    summary['isolated'] = int(((arrays['degree_in'] == 0) & (arrays['degree_out'] == 0)).sum())
+    return summary
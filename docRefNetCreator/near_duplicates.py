@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import json
+import zlib
+import numpy as np
+from pathlib import Path
+
+from .documents import PlainCachedDocument
+from .tfidf_index import scan_plaincache
+from .tokenizer import iter_tokens
+
+INDEX_DIR = Path('indexcache', 'minhash')
+EMPTY_HASH = np.uint64(0xFFFFFFFF)
+
+
+def shingle_hashes(text, shingle_size=5):
+    words = list(iter_tokens(text))
+    if len(words) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    shingles = [
+        ' '.join(words[i:i+shingle_size])
+        for i in range(max(1, len(words)-shingle_size+1))
+    ]
+    return np.unique(np.fromiter(
+        (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    ))
+
+
+class UnionFind:
+    def __init__(self, size):
+        self._parent = list(range(size))
+
+    def find(self, item):
+        root = item
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[item] != root:
+            self._parent[item], item = root, self._parent[item]
+        return root
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self._parent[max(ra, rb)] = min(ra, rb)
+
+
+class MinHashIndex:
+    def __init__(self, directory=INDEX_DIR, num_perm=128, bands=16, shingle_size=5, seed=1):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be a multiple of bands")
+        self._directory = Path(directory)
+        self._bands = bands
+        self._shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2**62, size=num_perm, dtype=np.int64).astype(np.uint64)*np.uint64(2)+np.uint64(1)
+        self._b = rng.randint(0, 2**62, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._keys = list()
+        self._mtimes = dict()
+        self._signatures = np.zeros((0, num_perm), dtype=np.uint64)
+
+    @classmethod
+    def load(cls, directory=INDEX_DIR, **kwargs):
+        index = cls(directory, **kwargs)
+        meta_path = index._directory.joinpath('meta.json')
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            signatures = np.load(str(index._directory.joinpath('signatures.npy')))
+            if (
+                meta['shingle_size'] == index._shingle_size and
+                signatures.shape[1] == len(index._a) and
+                np.array_equal(np.array(meta['a'], dtype=np.uint64), index._a)
+            ):
+                index._keys = meta['keys']
+                index._mtimes = meta['mtimes']
+                index._signatures = signatures
+        return index
+
+    def save(self):
+        self._directory.mkdir(parents=True, exist_ok=True)
+        np.save(str(self._directory.joinpath('signatures.npy')), self._signatures)
+        self._directory.joinpath('meta.json').write_text(json.dumps({
+            'keys': self._keys,
+            'mtimes': self._mtimes,
+            'shingle_size': self._shingle_size,
+            'a': self._a.tolist(),
+        }))
+
+    def __len__(self):
+        return len(self._keys)
+
+    @property
+    def keys(self):
+        return list(self._keys)
+
+    def signature(self, text, chunk_size=4096):
+        hashes = shingle_hashes(text, self._shingle_size)
+        signature = np.full(len(self._a), EMPTY_HASH, dtype=np.uint64)
+        for start in range(0, len(hashes), chunk_size):
+            chunk = hashes[start:start+chunk_size]
+            permuted = (np.outer(self._a, chunk)+self._b[:, None]) >> np.uint64(32)
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+        return signature
+
+    def update(self, cachedir=Path('plaincache')):
+        found = scan_plaincache(cachedir)
+        stale = {key for key in self._keys if found.get(key) != self._mtimes[key]}
+        fresh = sorted(key for key, mtime in found.items() if self._mtimes.get(key) != mtime)
+        if len(stale) == 0 and len(fresh) == 0:
+            return 0
+        kept = [row for row, key in enumerate(self._keys) if key not in stale]
+        added = [self.signature(PlainCachedDocument(key, None).parse(' ')) for key in fresh]
+        self._signatures = np.vstack([
+            self._signatures[kept],
+            np.array(added, dtype=np.uint64).reshape(len(added), len(self._a))
+        ])
+        self._keys = [self._keys[row] for row in kept] + fresh
+        self._mtimes = {key: found[key] for key in self._keys}
+        return len(stale | set(fresh))
+
+    def candidates(self):
+        rows = len(self._a)//self._bands
+        nonempty = np.flatnonzero(~(self._signatures == EMPTY_HASH).all(axis=1))
+        pairs = set()
+        for band in range(self._bands):
+            buckets = dict()
+            for doc in nonempty:
+                bucket = self._signatures[doc, band*rows:(band+1)*rows].tobytes()
+                buckets.setdefault(bucket, list()).append(int(doc))
+            for members in buckets.values():
+                for i, a in enumerate(members):
+                    for b in members[i+1:]:
+                        pairs.add((a, b))
+        return pairs
+
+    def similarity(self, a, b):
+        return float(np.mean(self._signatures[a] == self._signatures[b]))
+
+    def clusters(self, threshold=0.8):
+        uf = UnionFind(len(self._keys))
+        for a, b in self.candidates():
+            if self.similarity(a, b) >= threshold:
+                uf.union(a, b)
+        groups = dict()
+        for doc in range(len(self._keys)):
+            groups.setdefault(uf.find(doc), list()).append(self._keys[doc])
+        return sorted(
+            (sorted(group) for group in groups.values() if len(group) > 1),
+            key=lambda group: group[0]
+        )
+
+
+def find_near_duplicates(cachedir=Path('plaincache'), directory=INDEX_DIR, threshold=0.8):
+    index = MinHashIndex.load(directory)
+    if index.update(cachedir) > 0:
+        index.save()
+    return index.clusters(threshold)
+
+
+def canonical_map(clusters, preference=lambda key: (len(key), key)):
+    canonical = dict()
+    for cluster in clusters:
+        representative = min(cluster, key=preference)
+        for key in cluster:
+            if key != representative:
+                canonical[key] = representative
+    return canonical
+
+
+def collapse_duplicates(graph, canonical):
+    def resolve(name):
+        target = canonical.get(name, name)
+        return target if target in graph else name
+    collapsed = dict()
+    for name, node in graph.items():
+        target = resolve(name)
+        if target not in collapsed:
+            collapsed[target] = {**graph[target], 'mention_freq': dict()}
+        mention_freq = collapsed[target]['mention_freq']
+        for mentioned, freq in node['mention_freq'].items():
+            if mentioned != name and resolve(mentioned) == target:
+                continue
+            mentioned = resolve(mentioned)
+            mention_freq[mentioned] = mention_freq.get(mentioned, 0) + freq
+    return collapsed
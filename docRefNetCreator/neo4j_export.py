@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import json
+from itertools import chain
+from pathlib import Path
+
+from .streaming import write_lines
+
+NEO4J_COLUMNS = (
+    ('name', 'name:ID(Document)'),
+    ('type', 'type'),
+    ('doc_id', 'doc_id'),
+    ('pub_date', 'pub_date'),
+    ('monitored', 'monitored:boolean'),
+    ('in_force', 'in_force:boolean'),
+)
+NODE_HEADER = (*(header for _, header in NEO4J_COLUMNS), ':LABEL')
+EDGE_HEADER = (':START_ID(Document)', ':END_ID(Document)', 'frequency:int', ':TYPE')
+BATCH_SIZE = 1000
+
+INDEXES = (
+    'CREATE CONSTRAINT document_name IF NOT EXISTS FOR (d:Document) REQUIRE d.name IS UNIQUE;',
+    'CREATE INDEX document_doc_id IF NOT EXISTS FOR (d:Document) ON (d.doc_id);',
+    'CREATE INDEX document_type IF NOT EXISTS FOR (d:Document) ON (d.type);',
+    'CALL db.awaitIndexes();',
+)
+MERGE_NODES = 'UNWIND {rows} AS row MERGE (d:Document {{name: row.name}}) SET d += row;'
+MERGE_EDGES = '''UNWIND {rows} AS row MATCH (s:Document {{name: row.src}}) MATCH (t:Document {{name: row.dst}}) \
+MERGE (s)-[m:MENTIONS]->(t) SET m.frequency = row.frequency;'''
+
+
+def neo4j_path(prefix):
+    return Path(f'{prefix}_neo4j')
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return '"true"' if value else '"false"'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return '"'+str(value).replace('"', '""')+'"'
+
+
+def csv_lines(rows):
+    for row in rows:
+        yield ','.join(csv_value(value) for value in row)
+
+
+def header_line(header):
+    return ','.join(header)
+
+
+def node_rows(core):
+    return zip(*(core.column(column) for column, _ in NEO4J_COLUMNS), ['Document']*len(core))
+
+
+def edge_rows(core):
+    names = core.column('name')
+    return ((names[src], names[dst], int(frequency), 'MENTIONS') for src, dst, frequency in core.edges())
+
+
+def cypher_literal(value):
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, dict):
+        return '{'+', '.join(f'`{key}`: {cypher_literal(item)}' for key, item in value.items())+'}'
+    if isinstance(value, (list, tuple)):
+        return '['+', '.join(cypher_literal(item) for item in value)+']'
+    return json.dumps(str(value))
+
+
+def batches(rows, size=BATCH_SIZE):
+    batch = list()
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = list()
+    if batch:
+        yield batch
+
+
+def cypher_lines(core, batch_size=BATCH_SIZE):
+    yield from INDEXES
+    columns = [column for column, _ in NEO4J_COLUMNS]
+    for batch in batches(zip(*(core.column(column) for column in columns)), batch_size):
+        yield MERGE_NODES.format(rows=cypher_literal([dict(zip(columns, row)) for row in batch]))
+    for batch in batches(edge_rows(core), batch_size):
+        yield MERGE_EDGES.format(rows=cypher_literal([
+            {'src': src, 'dst': dst, 'frequency': frequency} for src, dst, frequency, _ in batch
+        ]))
+
+
+def import_command(database='neo4j'):
+    return ' '.join([
+        'neo4j-admin database import full',
+        '--nodes=documents_header.csv,documents.csv',
+        '--relationships=mentions_header.csv,mentions.csv',
+        '--overwrite-destination',
+        database,
+    ])
+
+
+def write_neo4j(folder, core, batch_size=BATCH_SIZE):
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    write_lines(folder.joinpath('documents_header.csv'), [header_line(NODE_HEADER), ''])
+    write_lines(folder.joinpath('documents.csv'), chain(csv_lines(node_rows(core)), ['']))
+    write_lines(folder.joinpath('mentions_header.csv'), [header_line(EDGE_HEADER), ''])
+    write_lines(folder.joinpath('mentions.csv'), chain(csv_lines(edge_rows(core)), ['']))
+    write_lines(folder.joinpath('import.sh'), [
+        '#!/bin/sh',
+        '# Offline bulk import; stop the database first.',
+        f'cd "$(dirname "$0")" && {import_command()}',
+        '',
+    ])
+    folder.joinpath('import.sh').chmod(0o755)
+    write_lines(folder.joinpath('load.cypher'), chain(cypher_lines(core, batch_size), ['']))
+    return folder
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import json
+import numpy as np
+from scipy import sparse
+from pathlib import Path
+
+
+def transition_matrix(core, weighted=False):
+    size = len(core)
+    weights = core.edge_weight.astype(np.float64) if weighted else np.ones(core.edge_count)
+    matrix = sparse.csr_matrix((weights, (core.edge_src, core.edge_dst)), shape=(size, size))
+    matrix.sum_duplicates()
+    out_weight = np.asarray(matrix.sum(axis=1)).ravel()
+    scale = np.divide(1.0, out_weight, out=np.zeros(size), where=out_weight != 0)
+    return sparse.csr_matrix(sparse.diags(scale) @ matrix).T.tocsr(), out_weight == 0
+
+
+def normalized(vector):
+    total = vector.sum()
+    return vector/total if total > 0 else np.full(len(vector), 1.0/len(vector))
+
+
+def pagerank(core, weighted=False, alpha=0.85, personalization=None, nstart=None, max_iter=100, tol=1e-6):
+    size = len(core)
+    if size == 0:
+        return np.zeros(0), 0
+    transposed, dangling = transition_matrix(core, weighted)
+    teleport = np.full(size, 1.0/size) if personalization is None else normalized(np.asarray(personalization, dtype=np.float64))
+    ranks = np.full(size, 1.0/size) if nstart is None else normalized(np.asarray(nstart, dtype=np.float64))
+    for iteration in range(1, max_iter+1):
+        previous = ranks
+        ranks = alpha*(transposed @ previous + previous[dangling].sum()*teleport)+(1-alpha)*teleport
+        if np.abs(ranks-previous).sum() < size*tol:
+            return ranks, iteration
+    raise RuntimeError(f"PageRank did not converge in {max_iter} iterations")
+
+
+def warm_start(path, labels):
+    path = Path(path)
+    if not path.exists():
+        return None
+    previous = json.loads(path.read_text())
+    return np.array([previous.get(label, 1.0/len(labels)) for label in labels], dtype=np.float64)
+
+
+def root_personalization(labels, root):
+    personalization = np.zeros(len(labels))
+    personalization[labels.index(root)] = 1.0
+    return personalization
+
+
+def ranks_dict(labels, ranks):
+    return dict(zip(labels, ranks.tolist()))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+from os import linesep as eol
+from threading import Lock
+from collections import OrderedDict
+
+from .documents import PlainCachedDocument
+from .word_count import WordCounter
+
+MiB = 1024*1024
+
+
+def paragraphs_size(paragraphs):
+    return sum(map(len, paragraphs)) + 64*len(paragraphs)
+
+
+def word_counter_size(wc):
+    return sum(map(len, wc._wordFreq.keys())) + 128*len(wc._wordFreq)
+
+
+class LRUCache:
+    def __init__(self, max_size, sizeof=len):
+        self._max_size = max_size
+        self._sizeof = sizeof
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, factory):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+        value = factory()
+        size = self._sizeof(value)
+        if size > self._max_size:
+            return value
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (value, size)
+                self._size += size
+            while self._size > self._max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits/lookups if lookups > 0 else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'size': self._size,
+            'max_size': self._max_size,
+        }
+
+
+class ParsedDocumentCache:
+    def __init__(self, max_text_size=512*MiB, max_vector_size=256*MiB):
+        self.texts = LRUCache(max_text_size, paragraphs_size)
+        self.vectors = LRUCache(max_vector_size, word_counter_size)
+        self.aliases = dict()
+
+    def add_aliases(self, canonical):
+        self.aliases.update(canonical)
+
+    def paragraphs(self, cachekey, clazz=None, *args, **kwargs):
+        if cachekey in self.aliases:
+            cachekey, clazz, args, kwargs = self.aliases[cachekey], None, (), {}
+        return self.texts.get(
+            cachekey,
+            lambda: PlainCachedDocument(cachekey, clazz, *args, **kwargs).parse(None)
+        )
+
+    def text(self, cachekey, cst_eol=eol, clazz=None, *args, **kwargs):
+        return cst_eol.join(self.paragraphs(cachekey, clazz, *args, **kwargs))
+
+    def word_counter(self, cachekey, clazz=None, *args, **kwargs):
+        if cachekey in self.aliases:
+            cachekey, clazz, args, kwargs = self.aliases[cachekey], None, (), {}
+        return self.vectors.get(
+            cachekey,
+            lambda: WordCounter.fromParagraphs(self.paragraphs(cachekey, clazz, *args, **kwargs))
+        )
+
+    def clear(self):
+        self.texts.clear()
+        self.vectors.clear()
+
+    def stats(self):
+        return {
+            'texts': self.texts.stats(),
+            'vectors': self.vectors.stats(),
+        }
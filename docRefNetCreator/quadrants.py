@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import numpy as np
+from contextlib import ExitStack
+
+QUADRANT_COLOR = ['#7DB643', '#43B5B5', '#7C43B5', '#B54343']
+QUADRANT_SINKS = (
+    ('', False, False),
+    ('_nodst3rdquad', False, True),
+    ('_nosrc3rdquad', True, False),
+    ('_no3rdquad', True, True),
+)
+
+
+def quadrant_codes(xs, ys, lx, ly):
+    right = xs >= lx
+    top = ys >= ly
+    return np.where(top, np.where(right, 1, 2), np.where(right, 4, 3)).astype(np.int8)
+
+
+def quadrant_counts(codes):
+    return np.bincount(codes, minlength=5)[1:].tolist()
+
+
+class QuadrantEngine:
+    def __init__(self, core, arrays):
+        self.core = core
+        self.arrays = arrays
+        self._codes = dict()
+
+    def points(self, key):
+        return self.arrays[f'{key}_in'], self.arrays[f'{key}_out']
+
+    def halfrange(self, key):
+        xs, ys = self.points(key)
+        return (int(xs.max())-int(xs.min()))/2, (int(ys.max())-int(ys.min()))/2
+
+    def codes(self, key, hr):
+        cached = self._codes.get((key, hr))
+        if cached is None:
+            cached = quadrant_codes(*self.points(key), *hr).tolist()
+            self._codes[(key, hr)] = cached
+        return cached
+
+    def colors(self, key, hr):
+        return [QUADRANT_COLOR[code-1] for code in self.codes(key, hr)]
+
+    def write_csvs(self, prefix, desc, labels, key, hr, weighted, buffering=1 << 20):
+        codes = self.codes(key, hr)
+        colors = self.colors(key, hr)
+        fmt = ','.join(['%s']*(4+int(weighted)))+'\n'
+        header = fmt % ("source", "target", *(["weight"]*int(weighted)), "source_color", "target_color")
+        with ExitStack() as stack:
+            sinks = list()
+            for suffix, skip_src, skip_dst in QUADRANT_SINKS:
+                file = stack.enter_context(open(f'{prefix}_quads_{desc}{suffix}.csv', 'w', buffering=buffering))
+                file.write(header)
+                sinks.append((file.write, skip_src, skip_dst))
+            for src, dst, frequency in self.core.edges():
+                row = fmt % (
+                    labels[src],
+                    labels[dst],
+                    *([frequency]*int(weighted)),
+                    colors[src],
+                    colors[dst],
+                )
+                src_third = codes[src] == 3
+                dst_third = codes[dst] == 3
+                for write, skip_src, skip_dst in sinks:
+                    if (skip_src and src_third) or (skip_dst and dst_third):
+                        continue
+                    write(row)
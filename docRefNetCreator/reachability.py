@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import json
+import numpy as np
+from pathlib import Path
+from scipy import sparse
+from scipy.sparse import csgraph
+
+
+def index_path(prefix):
+    return Path(f'{prefix}_reachability.npz')
+
+
+def bit_of(position):
+    return position >> 3, np.uint8(0x80 >> (position & 7))
+
+
+def topological_order(count, dag_src, dag_dst):
+    matrix = sparse.csr_matrix(
+        (np.ones(len(dag_src), dtype=np.int8), (dag_src, dag_dst)),
+        shape=(count, count)
+    )
+    indegree = np.bincount(dag_dst, minlength=count)
+    order = list(np.flatnonzero(indegree == 0))
+    indptr, indices = matrix.indptr, matrix.indices
+    for node in order:
+        for child in indices[indptr[node]:indptr[node+1]]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                order.append(child)
+    return order, matrix
+
+
+def closure_rows(count, order, matrix):
+    rows = np.zeros((count, (count+7)//8), dtype=np.uint8)
+    indptr, indices = matrix.indptr, matrix.indices
+    for node in reversed(order):
+        children = indices[indptr[node]:indptr[node+1]]
+        if len(children) == 0:
+            continue
+        row = np.bitwise_or.reduce(rows[children], axis=0)
+        for child in children:
+            byte, mask = bit_of(child)
+            row[byte] |= mask
+        rows[node] = row
+    return rows
+
+
+class ReachabilityIndex:
+    def __init__(self, labels, edge_src, edge_dst, components=None, descendants=None, ancestors=None):
+        self.labels = list(labels)
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        self.edge_src = np.asarray(edge_src, dtype=np.int32)
+        self.edge_dst = np.asarray(edge_dst, dtype=np.int32)
+        if components is None:
+            self.rebuild()
+        else:
+            self.components = np.asarray(components, dtype=np.int32)
+            self.descendants = descendants
+            self.ancestors = ancestors
+
+    @classmethod
+    def from_core(cls, core):
+        return cls(core.labels, core.edge_src, core.edge_dst)
+
+    @classmethod
+    def load(cls, prefix):
+        with np.load(str(index_path(prefix))) as data:
+            return cls(
+                json.loads(str(data['labels'])),
+                data['edge_src'],
+                data['edge_dst'],
+                data['components'],
+                data['descendants'],
+                data['ancestors'],
+            )
+
+    def save(self, prefix):
+        path = index_path(prefix)
+        temp = path.with_name(path.name+'.tmp.npz')
+        np.savez_compressed(
+            str(temp),
+            labels=np.array(json.dumps(self.labels)),
+            edge_src=self.edge_src,
+            edge_dst=self.edge_dst,
+            components=self.components,
+            descendants=self.descendants,
+            ancestors=self.ancestors,
+        )
+        temp.replace(path)
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def component_count(self):
+        return len(self.descendants)
+
+    def condensation(self):
+        dag_src = self.components[self.edge_src]
+        dag_dst = self.components[self.edge_dst]
+        keep = dag_src != dag_dst
+        pairs = np.unique(np.stack([dag_src[keep], dag_dst[keep]], axis=1), axis=0) if keep.any() else np.zeros((0, 2), dtype=np.int32)
+        return pairs[:, 0], pairs[:, 1]
+
+    def rebuild(self):
+        size = len(self.labels)
+        matrix = sparse.csr_matrix(
+            (np.ones(len(self.edge_src), dtype=np.int8), (self.edge_src, self.edge_dst)),
+            shape=(size, size)
+        )
+        count, components = csgraph.connected_components(matrix, directed=True, connection='strong')
+        self.components = components.astype(np.int32)
+        dag_src, dag_dst = self.condensation()
+        order, forward = topological_order(count, dag_src, dag_dst)
+        self.descendants = closure_rows(count, order, forward)
+        _, backward = topological_order(count, dag_dst, dag_src)
+        self.ancestors = closure_rows(count, order[::-1], backward)
+
+    def _component(self, label):
+        return self.components[self.index[label]]
+
+    def _members(self, rows, extra=()):
+        mask = np.unpackbits(rows, count=self.component_count).astype(bool)
+        for component in extra:
+            mask[component] = True
+        return [self.labels[node] for node in np.flatnonzero(mask[self.components])]
+
+    def _excluding(self, members, labels, related):
+        own = set(labels)
+        return [label for label in members if label not in own or any(related(label, other) for other in own)]
+
+    def _has(self, rows, component):
+        byte, mask = bit_of(component)
+        return bool(rows[byte] & mask)
+
+    def reaches(self, src, dst):
+        source, target = self._component(src), self._component(dst)
+        if source == target:
+            return True
+        return self._has(self.descendants[source], target)
+
+    def is_descendant(self, node, of):
+        return node != of and self.reaches(of, node)
+
+    def is_ancestor(self, node, of):
+        return node != of and self.reaches(node, of)
+
+    def descendants_of(self, *labels):
+        components = [self._component(label) for label in labels]
+        rows = np.bitwise_or.reduce(self.descendants[components], axis=0)
+        return self._excluding(self._members(rows, components), labels, self.is_descendant)
+
+    def ancestors_of(self, *labels):
+        components = [self._component(label) for label in labels]
+        rows = np.bitwise_or.reduce(self.ancestors[components], axis=0)
+        return self._excluding(self._members(rows, components), labels, self.is_ancestor)
+
+    def common_descendants(self, *labels):
+        rows = np.bitwise_and.reduce(self.descendants[[self._component(label) for label in labels]], axis=0)
+        return self._members(rows)
+
+    def common_ancestors(self, *labels):
+        rows = np.bitwise_and.reduce(self.ancestors[[self._component(label) for label in labels]], axis=0)
+        return self._members(rows)
+
+    def add_node(self, label):
+        if label in self.index:
+            return self.index[label]
+        self.index[label] = len(self.labels)
+        self.labels.append(label)
+        component = self.component_count
+        self.components = np.append(self.components, np.int32(component))
+        width = (component+8)//8
+        rows = list()
+        for closure in (self.descendants, self.ancestors):
+            if closure.shape[1] < width:
+                closure = np.pad(closure, ((0, 0), (0, width-closure.shape[1])))
+            rows.append(np.vstack([closure, np.zeros((1, width), dtype=np.uint8)]))
+        self.descendants, self.ancestors = rows
+        return self.index[label]
+
+    def add_edge(self, src, dst):
+        self.edge_src = np.append(self.edge_src, np.int32(self.add_node(src)))
+        self.edge_dst = np.append(self.edge_dst, np.int32(self.add_node(dst)))
+        source, target = self._component(src), self._component(dst)
+        if source == target:
+            return False
+        if self._has(self.descendants[target], source):
+            self.rebuild()
+            return True
+        if self._has(self.descendants[source], target):
+            return False
+        down = self.descendants[target].copy()
+        byte, mask = bit_of(target)
+        down[byte] |= mask
+        up = self.ancestors[source].copy()
+        byte, mask = bit_of(source)
+        up[byte] |= mask
+        above = np.unpackbits(up, count=self.component_count).astype(bool)
+        below = np.unpackbits(down, count=self.component_count).astype(bool)
+        self.descendants[above] |= down
+        self.ancestors[below] |= up
+        return False
+
+
+def build_reachability_index(core, prefix):
+    path = index_path(prefix)
+    if path.exists():
+        index = ReachabilityIndex.load(prefix)
+        if index.labels == core.labels and np.array_equal(index.edge_src, core.edge_src) and np.array_equal(index.edge_dst, core.edge_dst):
+            return index
+    index = ReachabilityIndex.from_core(core)
+    index.save(prefix)
+    return index
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import heapq
+from collections import deque
+
+INFINITY = float('inf')
+
+
+def adjacency_from_csr(indptr, indices, weights):
+    indptr = indptr.tolist()
+    indices = indices.tolist()
+    weights = weights.tolist()
+    return tuple(
+        tuple(zip(indices[indptr[i]:indptr[i+1]], weights[indptr[i]:indptr[i+1]]))
+        for i in range(len(indptr)-1)
+    )
+
+
+def bfs_hops(adjacency, source):
+    distances = [-1]*len(adjacency)
+    distances[source] = 0
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        distance = distances[node]+1
+        for target, _ in adjacency[node]:
+            if distances[target] < 0:
+                distances[target] = distance
+                queue.append(target)
+    return distances
+
+
+def dijkstra_heap(adjacency, source):
+    distances = [INFINITY]*len(adjacency)
+    distances[source] = 0
+    heap = [(0, source)]
+    while heap:
+        distance, node = heapq.heappop(heap)
+        if distance > distances[node]:
+            continue
+        for target, weight in adjacency[node]:
+            candidate = distance+weight
+            if candidate < distances[target]:
+                distances[target] = candidate
+                heapq.heappush(heap, (candidate, target))
+    return [-1 if distance == INFINITY else distance for distance in distances]
+
+
+class ShortestPaths:
+    def __init__(self, adjacency, hops_mode=False):
+        self._adjacency = adjacency
+        self._hops_mode = hops_mode
+
+    def __call__(self, source):
+        if self._hops_mode:
+            return bfs_hops(self._adjacency, source)
+        return dijkstra_heap(self._adjacency, source)
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import sys
+
+from .tfidf_index import build_tfidf_index
+
+TOP_K = 10
+
+
+def main():
+    index = build_tfidf_index()
+    print(f"TF-IDF index: {len(index)} documents, {index.size_bytes} bytes, built in {index.build_seconds:.2f}s")
+    for key in sys.argv[1:]:
+        if key not in index:
+            print(f"{key}: not in plaincache/")
+            continue
+        print(f"{key}:")
+        for other, score in index.top_k(key, TOP_K):
+            print(f"  {score:.4f}  {other}")
+
+
+if __name__ == '__main__':
+    main()
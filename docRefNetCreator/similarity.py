@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import numpy as np
+from scipy import sparse
+
+from .tokenizer import shared_vocabulary
+
+
+class SimilarityEngine:
+    def __init__(self, vocabulary=shared_vocabulary):
+        self._vocabulary = vocabulary
+        self._rows = dict()
+        self._pending = list()
+        self._matrix = sparse.csr_matrix((0, 0), dtype=np.float64)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def add(self, key, word_counter):
+        if key not in self._rows:
+            self._rows[key] = len(self._rows)
+            self._pending.append(word_counter.termCounts(self._vocabulary))
+        return self._rows[key]
+
+    def row(self, key):
+        return self._rows[key]
+
+    @property
+    def matrix(self):
+        if len(self._pending) > 0:
+            termCounts = self._pending
+            indices = np.concatenate([np.zeros(0, dtype=np.int64)]+[ids for ids, _ in termCounts])
+            data = np.concatenate([np.zeros(0)]+[counts for _, counts in termCounts]).astype(np.float64)
+            indptr = np.cumsum([0]+[len(ids) for ids, _ in termCounts], dtype=np.int64)
+            rows = np.repeat(np.arange(len(self._pending)), np.diff(indptr))
+            norms = np.sqrt(np.bincount(rows, weights=data*data, minlength=len(self._pending)))
+            data /= norms[rows]
+            width = len(self._vocabulary)
+            added = sparse.csr_matrix(
+                (data, indices, indptr),
+                shape=(len(self._pending), width)
+            )
+            previous = self._matrix
+            previous.resize((previous.shape[0], width))
+            self._matrix = sparse.vstack([previous, added], format='csr')
+            self._pending = list()
+        return self._matrix
+
+    def pairs(self, pairs, batch_size=65536):
+        matrix = self.matrix
+        pairs = list(pairs)
+        similarities = np.zeros(len(pairs), dtype=np.float64)
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start:start+batch_size]
+            srcs = np.fromiter((self._rows[s] for s, _ in batch), dtype=np.int64, count=len(batch))
+            dsts = np.fromiter((self._rows[d] for _, d in batch), dtype=np.int64, count=len(batch))
+            similarities[start:start+len(batch)] = np.asarray(
+                matrix[srcs].multiply(matrix[dsts]).sum(axis=1)
+            ).ravel()
+        return similarities
+
+    def block(self, src_keys=None, dst_keys=None):
+        matrix = self.matrix
+        srcs = matrix if src_keys is None else matrix[[self._rows[k] for k in src_keys]]
+        dsts = matrix if dst_keys is None else matrix[[self._rows[k] for k in dst_keys]]
+        return (srcs @ dsts.T).toarray()
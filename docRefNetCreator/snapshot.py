@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import json
+import mmap
+import struct
+import numpy as np
+from pathlib import Path
+
+MAGIC = b'DRNSNAP1'
+ALIGNMENT = 64
+PREAMBLE = struct.Struct('<8sQ')
+EDGE_KEY = 'mention_freq'
+
+
+def snapshot_path(prefix):
+    return Path(f'{prefix}.snapshot')
+
+
+def is_fresh(prefix):
+    path = snapshot_path(prefix)
+    source = Path(f'{prefix}.json')
+    return path.exists() and (not source.exists() or path.stat().st_mtime_ns >= source.stat().st_mtime_ns)
+
+
+class StringTable:
+    def __init__(self):
+        self.index = dict()
+        self.strings = list()
+
+    def add(self, value):
+        position = self.index.get(value)
+        if position is None:
+            position = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return position
+
+    def arrays(self):
+        encoded = [value.encode('utf-8') for value in self.strings]
+        offsets = np.zeros(len(encoded)+1, dtype='<i8')
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def column_encoding(values):
+    present = [value for value in values if value is not None]
+    if all(isinstance(value, bool) for value in present):
+        return 'bool'
+    if all(isinstance(value, str) for value in present):
+        return 'string'
+    return 'json'
+
+
+def encode_column(values, encoding, strings):
+    if encoding == 'bool':
+        return np.array([-1 if value is None else int(value) for value in values], dtype='<i1')
+    if encoding == 'string':
+        return np.array([-1 if value is None else strings.add(value) for value in values], dtype='<i4')
+    return np.array([strings.add(json.dumps(value)) for value in values], dtype='<i4')
+
+
+def decode_column(array, encoding, strings):
+    if encoding == 'bool':
+        return [None if value < 0 else bool(value) for value in array.tolist()]
+    if encoding == 'string':
+        return [None if value < 0 else strings[value] for value in array.tolist()]
+    return [json.loads(strings[value]) for value in array.tolist()]
+
+
+def snapshot_arrays(graph):
+    keys = list(graph.keys())
+    index = {key: i for i, key in enumerate(keys)}
+    strings = StringTable()
+    orders = dict()
+    node_order = list()
+    columns = dict()
+    for key in keys:
+        fields = tuple(graph[key].keys())
+        node_order.append(orders.setdefault(fields, len(orders)))
+        for field in fields:
+            if field != EDGE_KEY:
+                columns.setdefault(field, None)
+    values = {column: [graph[key].get(column) for key in keys] for column in columns}
+    encodings = {column: column_encoding(values[column]) for column in columns}
+    arrays = {
+        'node_key': np.array([strings.add(key) for key in keys], dtype='<i4'),
+        'node_order': np.array(node_order, dtype='<i4'),
+    }
+    for column in columns:
+        arrays[f'column:{column}'] = encode_column(values[column], encodings[column], strings)
+    edge_src = list()
+    edge_dst = list()
+    edge_weight = list()
+    for src, key in enumerate(keys):
+        for target, weight in graph[key].get(EDGE_KEY, dict()).items():
+            if target not in index:
+                raise ValueError(f"Mention of {target!r} from {key!r} is not a node of the graph")
+            edge_src.append(src)
+            edge_dst.append(index[target])
+            edge_weight.append(weight)
+    if all(type(weight) is int for weight in edge_weight):
+        weight_dtype = '<i8'
+    elif all(type(weight) is float for weight in edge_weight):
+        weight_dtype = '<f8'
+    else:
+        raise ValueError("Mention weights must be all integers or all floats")
+    arrays['edge_src'] = np.array(edge_src, dtype='<i4')
+    arrays['edge_dst'] = np.array(edge_dst, dtype='<i4')
+    arrays['edge_weight'] = np.array(edge_weight, dtype=weight_dtype)
+    arrays['strings_data'], arrays['strings_offsets'] = strings.arrays()
+    header = {
+        'version': 1,
+        'nodes': len(keys),
+        'edges': len(edge_src),
+        'orders': [list(fields) for fields in orders],
+        'columns': encodings,
+    }
+    return header, arrays
+
+
+def aligned(offset):
+    return -(-offset//ALIGNMENT)*ALIGNMENT
+
+
+def write_snapshot(path, graph):
+    path = Path(path)
+    header, arrays = snapshot_arrays(graph)
+    header['arrays'] = dict()
+    offset = 0
+    for name, array in arrays.items():
+        header['arrays'][name] = {'dtype': array.dtype.str, 'count': len(array), 'offset': offset}
+        offset = aligned(offset+array.nbytes)
+    encoded = json.dumps(header).encode('utf-8')
+    start = aligned(PREAMBLE.size+len(encoded))
+    temp = path.with_name(path.name+'.tmp')
+    with temp.open('wb') as file:
+        file.write(PREAMBLE.pack(MAGIC, len(encoded)))
+        file.write(encoded)
+        for name, array in arrays.items():
+            file.seek(start+header['arrays'][name]['offset'])
+            file.write(array.tobytes())
+        file.truncate(start+offset)
+    temp.replace(path)
+    return path
+
+
+class Snapshot:
+    def __init__(self, path):
+        self.path = Path(path)
+        with self.path.open('rb') as file:
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, size = PREAMBLE.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a graph snapshot")
+        self.header = json.loads(bytes(self._buffer[PREAMBLE.size:PREAMBLE.size+size]).decode('utf-8'))
+        self._start = aligned(PREAMBLE.size+size)
+        self._strings = None
+
+    @classmethod
+    def load(cls, prefix):
+        return cls(snapshot_path(prefix))
+
+    def __len__(self):
+        return self.header['nodes']
+
+    def array(self, name):
+        spec = self.header['arrays'][name]
+        return np.frombuffer(self._buffer, dtype=spec['dtype'], count=spec['count'], offset=self._start+spec['offset'])
+
+    @property
+    def edge_src(self):
+        return self.array('edge_src')
+
+    @property
+    def edge_dst(self):
+        return self.array('edge_dst')
+
+    @property
+    def edge_weight(self):
+        return self.array('edge_weight')
+
+    def string(self, position):
+        offsets = self.array('strings_offsets')
+        return bytes(self.array('strings_data')[offsets[position]:offsets[position+1]]).decode('utf-8')
+
+    @property
+    def strings(self):
+        if self._strings is None:
+            offsets = self.array('strings_offsets').tolist()
+            data = bytes(self.array('strings_data'))
+            self._strings = [data[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+        return self._strings
+
+    @property
+    def keys(self):
+        return [self.strings[position] for position in self.array('node_key').tolist()]
+
+    def column(self, name):
+        return decode_column(self.array(f'column:{name}'), self.header['columns'][name], self.strings)
+
+    def to_graph(self):
+        keys = self.keys
+        columns = {name: self.column(name) for name in self.header['columns']}
+        orders = self.header['orders']
+        ptr = np.concatenate([[0], np.cumsum(np.bincount(self.edge_src, minlength=len(keys)))]).tolist()
+        edge_dst = self.edge_dst.tolist()
+        edge_weight = self.edge_weight.tolist()
+        graph = dict()
+        for node, (key, order) in enumerate(zip(keys, self.array('node_order').tolist())):
+            graph[key] = {
+                field: {
+                    keys[edge_dst[edge]]: edge_weight[edge] for edge in range(ptr[node], ptr[node+1])
+                } if field == EDGE_KEY else columns[field][node]
+                for field in orders[order]
+            }
+        return graph
+
+
+def snapshot_from_json(prefix):
+    return write_snapshot(snapshot_path(prefix), json.loads(Path(f'{prefix}.json').read_text()))
+
+
+def json_from_snapshot(prefix, path=None):
+    path = Path(f'{prefix}.json') if path is None else Path(path)
+    path.write_text(json.dumps(Snapshot.load(prefix).to_graph()))
+    return path
+
+
+def load_graph(prefix):
+    if is_fresh(prefix):
+        return Snapshot.load(prefix).to_graph()
+    return json.loads(Path(f'{prefix}.json').read_text())
+
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import sys
+from pathlib import Path
+
+from .snapshot import json_from_snapshot
+from .snapshot import snapshot_from_json
+
+
+def main():
+    for argument in sys.argv[1:] or ['graph.json', 'graph_noctx.json']:
+        path = Path(argument)
+        prefix = str(path.with_suffix(''))
+        if path.suffix == '.snapshot':
+            print(json_from_snapshot(prefix))
+        else:
+            print(snapshot_from_json(prefix))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import sqlite3
+from pathlib import Path
+
+from .graph_core import NODE_COLUMNS
+
+SQL_COLUMNS = NODE_COLUMNS[:7]
+
+LOAD_PRAGMAS = (
+    'PRAGMA journal_mode = OFF',
+    'PRAGMA synchronous = OFF',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -65536',
+)
+
+UPSERT_PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -65536',
+)
+
+SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS node (
+        name VARCHAR(255),
+        generic_name VARCHAR(255),
+        type VARCHAR(255),
+        doc_id VARCHAR(255),
+        monitored bool,
+        pub_date VARCHAR(255),
+        in_force bool)''',
+    '''CREATE TABLE IF NOT EXISTS edge (
+        node_src INTEGER,
+        node_dst INTEGER,
+        mentions INTEGER,
+        FOREIGN KEY(node_src) REFERENCES node(rowid) ON UPDATE CASCADE ON DELETE CASCADE,
+        FOREIGN KEY(node_dst) REFERENCES node(rowid) ON UPDATE CASCADE ON DELETE CASCADE)''',
+)
+
+INDEXES = (
+    'CREATE UNIQUE INDEX IF NOT EXISTS node_name ON node(name)',
+    'CREATE UNIQUE INDEX IF NOT EXISTS edge_node_src ON edge(node_src, node_dst)',
+    'CREATE INDEX IF NOT EXISTS edge_node_dst ON edge(node_dst)',
+)
+
+INSERT_NODE = f'''INSERT INTO node({','.join(SQL_COLUMNS)}) VALUES({','.join(['?']*len(SQL_COLUMNS))})'''
+UPSERT_NODE = INSERT_NODE+''' ON CONFLICT(name) DO UPDATE SET '''+','.join(
+    f'{column}=excluded.{column}' for column in SQL_COLUMNS[1:]
+)+f''' WHERE ({','.join(f'node.{column}' for column in SQL_COLUMNS[1:])}) IS NOT ({
+    ','.join(f'excluded.{column}' for column in SQL_COLUMNS[1:])
+})'''
+INSERT_EDGE = '''INSERT INTO edge(node_src,node_dst,mentions) VALUES(?,?,?)'''
+UPSERT_EDGE = INSERT_EDGE+''' ON CONFLICT(node_src,node_dst) DO UPDATE SET mentions=excluded.mentions \
+WHERE edge.mentions IS NOT excluded.mentions'''
+
+
+def views(label_key):
+    return (
+        f'''CREATE VIEW IF NOT EXISTS nodes AS
+        SELECT
+            rowid as id,
+            {label_key} as label
+        FROM node''',
+        '''CREATE VIEW IF NOT EXISTS edges AS
+        SELECT
+            rowid as id,
+            node_src as source,
+            node_dst as target,
+            mentions as weight
+        FROM edge''',
+    )
+
+
+def node_rows(core):
+    return zip(*(core.column(column) for column in SQL_COLUMNS))
+
+
+def is_upsertable(path):
+    path = Path(path)
+    if not path.exists():
+        return False
+    sqldb = sqlite3.connect(str(path))
+    try:
+        return sqldb.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'node_name'").fetchone() is not None
+    except sqlite3.DatabaseError:
+        return False
+    finally:
+        sqldb.close()
+
+
+def write_sqlite(path, core, label_key, incremental=False):
+    path = Path(path)
+    if not incremental and path.exists():
+        path.unlink()
+    sqldb = sqlite3.connect(str(path), isolation_level=None)
+    cur = sqldb.cursor()
+    for pragma in UPSERT_PRAGMAS if incremental else LOAD_PRAGMAS:
+        cur.execute(pragma)
+    cur.execute('BEGIN')
+    for statement in (*SCHEMA, *views(label_key)):
+        cur.execute(statement)
+    if incremental:
+        for statement in INDEXES:
+            cur.execute(statement)
+    cur.executemany(UPSERT_NODE if incremental else INSERT_NODE, node_rows(core))
+    if incremental:
+        rowids = dict(cur.execute('SELECT name, rowid FROM node'))
+        node_ids = [rowids[name] for name in core.column('name')]
+    else:
+        node_ids = list(range(1, len(core)+1))
+    cur.executemany(
+        UPSERT_EDGE if incremental else INSERT_EDGE,
+        ((node_ids[src], node_ids[dst], frequency) for src, dst, frequency in core.edges())
+    )
+    if incremental:
+        prune(cur, core, node_ids)
+    else:
+        for statement in INDEXES:
+            cur.execute(statement)
+    cur.execute('COMMIT')
+    cur.close()
+    return sqldb, node_ids
+
+
+def prune(cur, core, node_ids):
+    cur.execute('CREATE TEMP TABLE keep_edge (node_src INTEGER, node_dst INTEGER, PRIMARY KEY(node_src, node_dst))')
+    cur.executemany(
+        'INSERT INTO keep_edge VALUES(?,?)',
+        ((node_ids[src], node_ids[dst]) for src, dst, _ in core.edges())
+    )
+    cur.execute('''DELETE FROM edge WHERE NOT EXISTS (
+        SELECT 1 FROM keep_edge WHERE keep_edge.node_src = edge.node_src AND keep_edge.node_dst = edge.node_dst)''')
+    cur.execute('CREATE TEMP TABLE keep_node (rowid INTEGER PRIMARY KEY)')
+    cur.executemany('INSERT INTO keep_node VALUES(?)', ((node_id,) for node_id in node_ids))
+    cur.execute('DELETE FROM node WHERE rowid NOT IN (SELECT rowid FROM keep_node)')
+    cur.execute('DROP TABLE keep_edge')
+    cur.execute('DROP TABLE keep_node')
+
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import json
+import time
+import hashlib
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import wait
+
+
+def state_path(prefix):
+    return Path(f'{prefix}_stages.json')
+
+
+def content_hash(path, chunk_size=1 << 20):
+    path = Path(path)
+    if not path.exists():
+        return None
+    if path.is_dir():
+        return 'directory'
+    digest = hashlib.sha1()
+    with path.open('rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Stage:
+    def __init__(self, name, function, inputs=(), outputs=(), params=None, adopt=False, exclusive=False):
+        self.name = name
+        self.function = function
+        self.inputs = [str(path) for path in inputs]
+        self.outputs = [str(path) for path in outputs]
+        self.params = params
+        self.adopt = adopt
+        self.exclusive = exclusive
+
+    def fingerprint(self):
+        return {
+            'inputs': {path: content_hash(path) for path in self.inputs},
+            'params': self.params,
+        }
+
+    def outputs_exist(self):
+        return all(Path(path).exists() for path in self.outputs)
+
+
+def _run_stage(function, args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter()-start
+
+
+class StageScheduler:
+    def __init__(self, prefix, stages, args=(), workers=None):
+        self.prefix = prefix
+        self.stages = {stage.name: stage for stage in stages}
+        self.args = tuple(args)
+        self.workers = workers or multiprocessing.cpu_count()
+        self.producers = {path: stage.name for stage in stages for path in stage.outputs}
+        self.dependencies = {
+            stage.name: {self.producers[path] for path in stage.inputs if path in self.producers} - {stage.name}
+            for stage in stages
+        }
+        path = state_path(prefix)
+        self.state = json.loads(path.read_text()) if path.exists() else dict()
+        self.timings = dict()
+
+    def save_state(self):
+        path = state_path(self.prefix)
+        temp = path.with_name(path.name+'.tmp')
+        temp.write_text(json.dumps(self.state, indent=2))
+        temp.replace(path)
+
+    def is_stale(self, stage):
+        if not stage.outputs_exist():
+            return True
+        recorded = self.state.get(stage.name)
+        if recorded is None:
+            if stage.adopt:
+                self.state[stage.name] = stage.fingerprint()
+                return False
+            return True
+        return recorded != stage.fingerprint()
+
+    def run(self):
+        pending = dict(self.stages)
+        finished = set()
+        start = time.perf_counter()
+        failures = dict()
+        running = dict()
+        exclusive = None
+        with ProcessPoolExecutor(self.workers) as ppe:
+            while pending or running:
+                for name in list(pending):
+                    stage = pending[name]
+                    if not self.dependencies[name] <= finished | set(failures):
+                        continue
+                    if len(self.dependencies[name] & set(failures)) > 0:
+                        del pending[name]
+                        failures[name] = None
+                        self.timings[name] = ('blocked', 0.0)
+                        continue
+                    if not self.is_stale(stage):
+                        del pending[name]
+                        finished.add(name)
+                        self.timings[name] = ('fresh', 0.0)
+                        continue
+                    if exclusive is not None or (stage.exclusive and running):
+                        continue
+                    del pending[name]
+                    print(f"Stage {self.prefix}/{name}: started")
+                    running[ppe.submit(_run_stage, stage.function, self.args)] = name
+                    if stage.exclusive:
+                        exclusive = name
+                if not running:
+                    if any(self.dependencies[name] <= finished | set(failures) for name in pending):
+                        continue
+                    if pending:
+                        raise ValueError(f"Stage dependencies cannot be satisfied: {sorted(pending)}")
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    if name == exclusive:
+                        exclusive = None
+                    try:
+                        seconds = future.result()
+                    except BaseException as e:
+                        failures[name] = e
+                        self.timings[name] = ('failed', 0.0)
+                        print(f"Stage {self.prefix}/{name}: failed with {e!r}")
+                        continue
+                    self.state[name] = self.stages[name].fingerprint()
+                    self.save_state()
+                    finished.add(name)
+                    self.timings[name] = ('built', seconds)
+                    print(f"Stage {self.prefix}/{name}: built in {seconds:.2f}s")
+        self.save_state()
+        self.print_summary(time.perf_counter()-start)
+        for error in failures.values():
+            if error is not None:
+                raise error
+        return self.timings
+
+    def print_summary(self, wall_seconds):
+        print(f"Stage summary for {self.prefix}:")
+        width = max(map(len, self.timings), default=0)
+        for name in self.stages:
+            status, seconds = self.timings.get(name, ('skipped', 0.0))
+            print(f"  {name.ljust(width)}  {status.ljust(7)}  {seconds:8.2f}s")
+        print(f"  {'total'.ljust(width)}  {''.ljust(7)}  {sum(seconds for _, seconds in self.timings.values()):8.2f}s")
+        print(f"  {'wall'.ljust(width)}  {''.ljust(7)}  {wall_seconds:8.2f}s")
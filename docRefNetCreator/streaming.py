@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import gzip
+import json
+from pathlib import Path
+
+BUFFER_SIZE = 1 << 20
+
+
+def output_path(path, compress=False):
+    path = Path(path)
+    return path.with_name(path.name+'.gz') if compress and path.suffix != '.gz' else path
+
+
+def open_output(path, compress=False):
+    path = output_path(path, compress)
+    if path.suffix == '.gz':
+        return gzip.open(str(path), 'wt', encoding='utf-8', compresslevel=6)
+    return open(str(path), 'w', encoding='utf-8', buffering=BUFFER_SIZE)
+
+
+def write_lines(path, lines, separator='\n', compress=False):
+    with open_output(path, compress) as file:
+        first = True
+        for line in lines:
+            if not first:
+                file.write(separator)
+            file.write(line)
+            first = False
+
+
+def write_chunks(path, chunks, compress=False):
+    with open_output(path, compress) as file:
+        for chunk in chunks:
+            file.write(chunk)
+
+
+def iter_json(obj, indent=None, depth=1, level=0):
+    if depth <= 0 or not isinstance(obj, (dict, list)) or len(obj) == 0:
+        chunk = json.dumps(obj, indent=indent)
+        yield chunk if indent is None or level == 0 else chunk.replace('\n', '\n'+' '*(indent*level))
+        return
+    items = obj.items() if isinstance(obj, dict) else enumerate(obj)
+    opening, closing = ('{', '}') if isinstance(obj, dict) else ('[', ']')
+    newline = '' if indent is None else '\n'+' '*(indent*(level+1))
+    yield opening
+    for position, (key, value) in enumerate(items):
+        yield ('' if position == 0 else ',' if indent is not None else ', ')+newline
+        if isinstance(obj, dict):
+            yield f'{json.dumps(key)}: '
+        yield from iter_json(value, indent, depth-1, level+1)
+    yield ('' if indent is None else '\n'+' '*(indent*level))+closing
+
+
+def write_json(path, obj, indent=None, compress=False, depth=1):
+    write_chunks(path, iter_json(obj, indent, depth), compress)
+
+
+def iter_json_matrices(matrices):
+    yield '{'
+    for position, (key, matrix) in enumerate(matrices.items()):
+        if position > 0:
+            yield ', '
+        yield f'{json.dumps(key)}: ['
+        for row in range(len(matrix)):
+            if row > 0:
+                yield ', '
+            yield json.dumps(matrix[row].tolist())
+        yield ']'
+    yield '}'
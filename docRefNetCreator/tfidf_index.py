@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import json
+import time
+import numpy as np
+from scipy import sparse
+from pathlib import Path
+
+from .documents import PlainCachedDocument
+from .tokenizer import Vocabulary
+from .word_count import WordCounter
+
+INDEX_DIR = Path('indexcache', 'tfidf')
+
+
+def scan_plaincache(cachedir=Path('plaincache')):
+    cachedir = Path(cachedir)
+    if not cachedir.exists():
+        return dict()
+    return {
+        file.relative_to(cachedir).as_posix(): file.stat().st_mtime
+        for file in cachedir.rglob('*')
+        if file.is_file()
+    }
+
+
+class TfIdfIndex:
+    def __init__(self, directory=INDEX_DIR):
+        self._directory = Path(directory)
+        self._keys = list()
+        self._rows = dict()
+        self._mtimes = dict()
+        self._vocabulary = Vocabulary()
+        self._counts = sparse.csr_matrix((0, 0), dtype=np.float64)
+        self._weights = None
+        self.build_seconds = 0.0
+
+    @classmethod
+    def load(cls, directory=INDEX_DIR):
+        index = cls(directory)
+        meta_path = index._directory.joinpath('meta.json')
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            index._keys = meta['keys']
+            index._rows = {key: row for row, key in enumerate(index._keys)}
+            index._mtimes = meta['mtimes']
+            index._vocabulary = Vocabulary(meta['terms'])
+            index.build_seconds = meta['build_seconds']
+            index._counts = sparse.load_npz(str(index._directory.joinpath('counts.npz'))).tocsr()
+        return index
+
+    def save(self):
+        self._directory.mkdir(parents=True, exist_ok=True)
+        sparse.save_npz(str(self._directory.joinpath('counts.npz')), self._counts)
+        self._directory.joinpath('meta.json').write_text(json.dumps({
+            'keys': self._keys,
+            'mtimes': self._mtimes,
+            'terms': self._vocabulary.terms,
+            'build_seconds': self.build_seconds,
+        }))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    @property
+    def keys(self):
+        return list(self._keys)
+
+    @property
+    def size_bytes(self):
+        if not self._directory.exists():
+            return 0
+        return sum(file.stat().st_size for file in self._directory.iterdir() if file.is_file())
+
+    def update(self, cachedir=Path('plaincache')):
+        start = time.perf_counter()
+        found = scan_plaincache(cachedir)
+        stale = {key for key in self._keys if found.get(key) != self._mtimes[key]}
+        fresh = sorted(key for key, mtime in found.items() if self._mtimes.get(key) != mtime)
+        if len(stale) == 0 and len(fresh) == 0:
+            return 0
+        kept = [row for row, key in enumerate(self._keys) if key not in stale]
+        keys = [self._keys[row] for row in kept]
+        termCounts = [
+            WordCounter.fromParagraphs(PlainCachedDocument(key, None).parse(None)).termCounts(self._vocabulary)
+            for key in fresh
+        ]
+        width = len(self._vocabulary)
+        previous = self._counts[kept]
+        previous.resize((previous.shape[0], width))
+        added = sparse.csr_matrix(
+            (
+                np.concatenate([np.zeros(0)]+[counts for _, counts in termCounts]).astype(np.float64),
+                np.concatenate([np.zeros(0, dtype=np.int64)]+[ids for ids, _ in termCounts]),
+                np.cumsum([0]+[len(ids) for ids, _ in termCounts], dtype=np.int64),
+            ),
+            shape=(len(fresh), width)
+        )
+        self._counts = sparse.vstack([previous, added], format='csr')
+        self._keys = keys + fresh
+        self._rows = {key: row for row, key in enumerate(self._keys)}
+        self._mtimes = {key: found[key] for key in self._keys}
+        self._weights = None
+        self.build_seconds += time.perf_counter() - start
+        return len(stale | set(fresh))
+
+    @property
+    def weights(self):
+        if self._weights is None:
+            weights = self._counts.copy()
+            df = np.bincount(weights.indices, minlength=weights.shape[1])
+            idf = np.log((1+weights.shape[0])/(1+df))+1
+            weights.data = (1+np.log(weights.data))*idf[weights.indices]
+            rows = np.repeat(np.arange(weights.shape[0]), np.diff(weights.indptr))
+            norms = np.sqrt(np.bincount(rows, weights=weights.data**2, minlength=weights.shape[0]))
+            weights.data /= norms[rows]
+            self._weights = weights
+        return self._weights
+
+    def top_k(self, key, k=10):
+        weights = self.weights
+        row = self._rows[key]
+        scores = (weights @ weights[row].T).toarray().ravel()
+        scores[row] = -np.inf
+        k = min(k, len(scores)-1)
+        if k <= 0:
+            return list()
+        best = np.argpartition(-scores, k-1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(self._keys[i], float(scores[i])) for i in best]
+
+
+def build_tfidf_index(cachedir=Path('plaincache'), directory=INDEX_DIR):
+    index = TfIdfIndex.load(directory)
+    if index.update(cachedir) > 0:
+        index.save()
+    return index
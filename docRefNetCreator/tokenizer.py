@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import numpy as np
+from collections import Counter
+
+ignoreList = [
+    *',.;/\\|?:~^`´[{(<>)}]=+-_&¨¬%$#@!"\'\r\n\b',
+]
+
+_translation_tables = dict()
+
+
+def translation_table(ignore=ignoreList):
+    key = tuple(ignore)
+    table = _translation_tables.get(key)
+    if table is None:
+        table = str.maketrans({char: ' ' for char in ignore})
+        _translation_tables[key] = table
+    return table
+
+
+def iter_tokens(text, ignore=ignoreList):
+    for word in text.translate(translation_table(ignore)).lower().split(' '):
+        if len(word) > 0:
+            yield word
+
+
+def count_words(text, ignore=ignoreList, counter=None):
+    if counter is None:
+        counter = Counter()
+    counter.update(text.translate(translation_table(ignore)).lower().split(' '))
+    counter.pop('', None)
+    return counter
+
+
+def count_paragraphs(paragraphs, ignore=ignoreList):
+    counter = Counter()
+    for paragraph in paragraphs:
+        count_words(paragraph, ignore, counter)
+    return counter
+
+
+class Vocabulary:
+    def __init__(self, terms=()):
+        self._terms = list(terms)
+        self._ids = {term: tid for tid, term in enumerate(self._terms)}
+
+    def __len__(self):
+        return len(self._terms)
+
+    def __contains__(self, term):
+        return term in self._ids
+
+    @property
+    def terms(self):
+        return list(self._terms)
+
+    def id(self, term):
+        return self._ids.get(term)
+
+    def term(self, tid):
+        return self._terms[tid]
+
+    def intern(self, term):
+        tid = self._ids.get(term)
+        if tid is None:
+            tid = len(self._terms)
+            self._ids[term] = tid
+            self._terms.append(term)
+        return tid
+
+    def intern_many(self, terms):
+        return np.fromiter(map(self.intern, terms), dtype=np.int64)
+
+
+shared_vocabulary = Vocabulary()
+
+
+def term_counts(counter, vocabulary=shared_vocabulary):
+    ids = vocabulary.intern_many(counter.keys())
+    counts = np.fromiter(counter.values(), dtype=np.int64, count=len(ids))
+    order = np.argsort(ids, kind='stable')
+    return ids[order], counts[order]
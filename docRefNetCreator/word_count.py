@@ -3,11 +3,14 @@
 
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
+from weakref import WeakKeyDictionary
 
-
-ignoreList = [
-    *',.;/\\|?:~^`´[{(<>)}]=+-_&¨¬%$#@!"\'\r\n\b',
-]
+from .similarity import SimilarityEngine
+from .tokenizer import ignoreList
+from .tokenizer import count_words
+from .tokenizer import count_paragraphs
+from .tokenizer import shared_vocabulary
+from .tokenizer import term_counts
 
 
 def list_cos_sim(a, b):
@@ -16,17 +19,19 @@ def list_cos_sim(a, b):
 
 class WordCounter:
     def __init__(self, text, ignore=ignoreList):
-        wf = dict()
-        self._wordFreq = wf
-        for exp in ignoreList:
-            text = text.replace(exp, ' ')
-        for word in text.split(' '):
-            if len(word) <= 0:
-                continue
-            lc = word.lower()
-            if lc not in wf:
-                wf[lc] = 0
-            wf[lc] += 1
+        self._wordFreq = count_words(text, ignore)
+        self._termCounts = WeakKeyDictionary()
+
+    @classmethod
+    def fromParagraphs(cls, paragraphs, ignore=ignoreList):
+        wc = cls('', ignore)
+        wc._wordFreq = count_paragraphs(paragraphs, ignore)
+        return wc
+
+    def termCounts(self, vocabulary=shared_vocabulary):
+        if vocabulary not in self._termCounts:
+            self._termCounts[vocabulary] = term_counts(self._wordFreq, vocabulary)
+        return self._termCounts[vocabulary]
 
     def unionKeySets(self, other):
         return sorted(list(set(list(self._wordFreq.keys())+list(other._wordFreq.keys()))))
@@ -34,7 +39,12 @@ class WordCounter:
     def populateFrequency(self, word_vector):
         return [self._wordFreq.get(word, 0) for word in word_vector]
 
-    def vectorSimilarity(self, other, function=list_cos_sim):
+    def vectorSimilarity(self, other, function=None):
+        if function is None:
+            engine = SimilarityEngine()
+            engine.add(0, self)
+            engine.add(1, other)
+            return engine.pairs([(0, 1)]).reshape(1, 1)
         resultingVectorKeys = self.unionKeySets(other)
         thisVector = self.populateFrequency(resultingVectorKeys)
         thatVector = other.populateFrequency(resultingVectorKeys)